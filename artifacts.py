@@ -0,0 +1,114 @@
+"""Binary model artifacts that can be opened with mmap.
+
+Layout::
+
+    MAGIC | header length (uint64, little-endian) | JSON header | data
+
+The JSON header holds the model kind, free-form metadata (vocabulary,
+settings, corpus hash) and, for every table column, its typecode, offset
+into the data section and element count. Columns are 8-byte aligned and
+stored in native byte order, so loading is a header parse plus zero-copy
+memoryviews over the mapped file; processes that open the same artifact
+share its pages.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+
+from sampling import AliasTable
+
+MAGIC = b"POEMART1"
+_ALIGN = 8
+
+
+def file_hash(paths: Iterable[str]) -> str:
+    """Return a SHA-256 hex digest over the contents of ``paths``, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % _ALIGN)
+
+
+def save_artifact(path: str, kind: str, meta: dict, tables: Dict[str, AliasTable]):
+    """Write ``tables`` and ``meta`` to ``path`` atomically."""
+    columns = []
+    layout = {}
+    offset = 0
+    for table_name, table in tables.items():
+        for column_name, values in table.columns().items():
+            data = array(AliasTable.COLUMNS[column_name], values).tobytes()
+            layout[f"{table_name}.{column_name}"] = [AliasTable.COLUMNS[column_name], offset, len(values)]
+            columns.append(data + _padding(len(data)))
+            offset += len(columns[-1])
+
+    header = json.dumps(
+        {"kind": kind, "byteorder": sys.byteorder, "meta": meta, "columns": layout},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 8 + len(header)) % _ALIGN)
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for data in columns:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_header(f) -> Tuple[dict, int]:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a poem model artifact")
+    (header_len,) = struct.unpack("<Q", f.read(8))
+    header = json.loads(f.read(header_len))
+    return header, len(MAGIC) + 8 + header_len
+
+
+def read_meta(path: str, kind: str) -> Optional[dict]:
+    """Return an artifact's metadata without mapping its tables, or None if unusable."""
+    try:
+        with open(path, "rb") as f:
+            header, _ = _read_header(f)
+    except (OSError, ValueError):
+        return None
+    if header.get("kind") != kind or header.get("byteorder") != sys.byteorder:
+        return None
+    return header["meta"]
+
+
+def load_artifact(path: str, kind: str) -> Tuple[dict, Dict[str, AliasTable], mmap.mmap]:
+    """Map ``path`` and return its metadata, tables and the backing mmap.
+
+    The tables are views into the mmap, which must stay open while they are used.
+    """
+    with open(path, "rb") as f:
+        header, data_start = _read_header(f)
+        if header.get("kind") != kind:
+            raise ValueError(f"artifact holds a {header.get('kind')!r} model, expected {kind!r}")
+        if header.get("byteorder") != sys.byteorder:
+            raise ValueError("artifact was written on a machine with a different byte order")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    table_columns: Dict[str, dict] = {}
+    for name, (typecode, offset, count) in header["columns"].items():
+        table_name, column_name = name.rsplit(".", 1)
+        start = data_start + offset
+        size = count * array(typecode).itemsize
+        table_columns.setdefault(table_name, {})[column_name] = view[start:start + size].cast(typecode)
+
+    tables = {name: AliasTable(**columns) for name, columns in table_columns.items()}
+    return header["meta"], tables, mapped
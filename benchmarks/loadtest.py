@@ -0,0 +1,121 @@
+"""Load-test client for poem_server.py.
+
+Keeps ``--concurrency`` HTTP/1.1 keep-alive connections busy until
+``--requests`` requests have completed, each asking for a poem with its
+own seed, and reports throughput, latency percentiles and non-200
+responses. Start the server first, then run from the repository root::
+
+    python poem_server.py --engines poem2 --port 8080
+    python benchmarks/loadtest.py --port 8080 --engine poem2 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+
+async def fetch(reader, writer, host: str, path: str):
+    """Send one GET on an open connection; return (status, body, keep_alive)."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    length = 0
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            keep_alive = value.strip().lower() != "close"
+    body = await reader.readexactly(length)
+    return status, body, keep_alive
+
+
+async def client(args, seeds, latencies, statuses):
+    reader = writer = None
+    while True:
+        try:
+            seed = next(seeds)
+        except StopIteration:
+            break
+        path = f"/poem?engine={args.engine}&stanzas={args.stanzas}&seed={seed}"
+        if writer is None:
+            reader, writer = await asyncio.open_connection(args.host, args.port)
+        started = time.perf_counter()
+        try:
+            status, _, keep_alive = await fetch(reader, writer, args.host, path)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            statuses["connection error"] += 1
+            writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        statuses[status] += 1
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(args):
+    seeds = iter(range(args.seed, args.seed + args.requests))
+    latencies = []
+    statuses = Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(client(args, seeds, latencies, statuses) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    report = {
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "rps": len(latencies) / elapsed,
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+    if latencies:
+        report["latency_ms"] = {
+            name: percentile(latencies, p) * 1000
+            for name, p in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("p999", 0.999), ("max", 1.0))
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure RPS and tail latency of poem_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--engine", default="poem2")
+    parser.add_argument("--stanzas", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first request; later requests count up")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['requests']} requests in {report['elapsed_s']:.2f} s: {report['rps']:.1f} req/s")
+    print("statuses: " + ", ".join(f"{status}: {count}" for status, count in report["statuses"].items()))
+    if "latency_ms" in report:
+        print("latency ms: " + ", ".join(f"{name} {value:.1f}" for name, value in report["latency_ms"].items()))
+
+
+if __name__ == "__main__":
+    main()
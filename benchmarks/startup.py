@@ -0,0 +1,71 @@
+"""Startup benchmark for the Frost generators.
+
+Reports the ``python -X importtime`` cumulative import cost of each module
+and the wall-clock latency of cold CLI runs that load a pretrained artifact
+(the first run trains and writes it). Run from the repository root::
+
+    python benchmarks/startup.py --corpus frost_poems.txt
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ("frost_markov", "frost_hmm")
+
+
+def import_time_us(module: str) -> int:
+    """Return the cumulative import time of ``module`` in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def run_latency_ms(args, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and cold-run latency of the Frost CLIs")
+    parser.add_argument("--corpus", default="frost_poems.txt")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = statistics.median(run_latency_ms(["-c", "pass"], args.repeat))
+    print(f"interpreter startup: {baseline:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for module in MODULES:
+            print(f"\n{module}")
+            print(f"  import (-X importtime): {import_time_us(module) / 1000:.1f} ms")
+
+            artifact = os.path.join(tmp, f"{module}.bin")
+            cli = [f"{module}.py", args.corpus, "--model", artifact]
+            train = run_latency_ms(cli, 1)[0]
+            timings = run_latency_ms(cli, args.repeat)
+            print(f"  first run (train + save): {train:.1f} ms")
+            print(
+                f"  cold run from artifact: median {statistics.median(timings):.1f} ms, "
+                f"max {max(timings):.1f} ms over {args.repeat} runs"
+            )
+
+
+if __name__ == "__main__":
+    main()
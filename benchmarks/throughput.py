@@ -0,0 +1,265 @@
+"""Throughput benchmark for the word-bank loaders, trainers and generators.
+
+Every case runs in a fresh interpreter with fixed seeds and reports
+operations per second, p50/p99 latency per operation and the peak RSS of
+that process. Cases cover loading words.txt/words2.txt and synthetic 10k
+and 100k-word banks, training both Frost models on frost_poems.txt and on
+scaled-up copies of it, poems per second for every generator, and the
+medium.py chain build. Run from the repository root::
+
+    python benchmarks/throughput.py                       # every case
+    python benchmarks/throughput.py poem2 train           # cases matching any filter
+    python benchmarks/throughput.py --save-baseline base.json
+    python benchmarks/throughput.py --baseline base.json  # exit 1 on regressions
+
+A case is a regression when its ops/sec drops or its p99 latency grows by
+more than ``--tolerance`` relative to the baseline.
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = "frost_poems.txt"
+
+
+def _synthetic_bank(source: str, size: int, sep: str, tmp: str) -> str:
+    """Write a ``size``-word bank reusing the tags of ``source`` with unique words."""
+    with open(os.path.join(ROOT, source), encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+    path = os.path.join(tmp, f"{size}-{source}")
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            word, rest = lines[i % len(lines)].split(sep, 1)
+            f.write(f"{word}{i}{sep}{rest}\n")
+    return path
+
+
+def _scaled_corpus(factor: int, tmp: str) -> str:
+    with open(os.path.join(ROOT, CORPUS), encoding="utf-8") as f:
+        text = f.read()
+    path = os.path.join(tmp, f"corpus-x{factor}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join([text] * factor))
+    return path
+
+
+# Each setup returns a zero-argument callable timed as one operation.
+
+def load_word_bank(size=None):
+    def setup(tmp, seed):
+        import poem
+        path = _synthetic_bank("words.txt", size, ":", tmp) if size else "words.txt"
+        return lambda: poem.load_word_bank(path)
+    return setup
+
+
+def load_words(size=None):
+    def setup(tmp, seed):
+        import poem2
+        path = _synthetic_bank("words2.txt", size, ",", tmp) if size else "words2.txt"
+        return lambda: poem2.load_words(path)
+    return setup
+
+
+def trigram_train(factor=1):
+    def setup(tmp, seed):
+        from frost_markov import TrigramModel
+        path = _scaled_corpus(factor, tmp) if factor > 1 else CORPUS
+        return lambda: TrigramModel(rng=random.Random(seed)).train(path)
+    return setup
+
+
+def hmm_train(factor=1):
+    def setup(tmp, seed):
+        from frost_hmm import HiddenMarkovPoet, load_corpus
+        tagged = load_corpus(CORPUS) * factor
+        return lambda: HiddenMarkovPoet(rng=random.Random(seed)).train(tagged)
+    return setup
+
+
+def poem_generate(tmp, seed):
+    import poem
+    rng = random.Random(seed)
+    return lambda: poem.generate_poem(rng=rng)
+
+
+def poem2_generate(tmp, seed):
+    import poem2
+    words = poem2.load_words("words2.txt")
+    rng = random.Random(seed)
+    return lambda: poem2.generate_poem(words, rng=rng)
+
+
+def markov_build_poem(tmp, seed):
+    from frost_markov import TrigramModel, build_poem
+    model = TrigramModel()
+    model.train(CORPUS)
+    rng = random.Random(seed)
+    return lambda: build_poem(model, rng=rng)
+
+
+def hmm_generate(tmp, seed):
+    from frost_hmm import HiddenMarkovPoet, load_corpus
+    poet = HiddenMarkovPoet()
+    poet.train(load_corpus(CORPUS))
+    rng = random.Random(seed)
+    return lambda: poet.generate_poem(rng=rng)
+
+
+def medium_chain(tmp, seed):
+    import medium
+    words = medium.load_words()
+    return lambda: medium.build_chain(words)
+
+
+# name -> (setup, operations timed at --scale 1)
+CASES = {
+    "load_word_bank/words.txt": (load_word_bank(), 50),
+    "load_word_bank/10k": (load_word_bank(10_000), 10),
+    "load_word_bank/100k": (load_word_bank(100_000), 3),
+    "load_words/words2.txt": (load_words(), 50),
+    "load_words/10k": (load_words(10_000), 10),
+    "load_words/100k": (load_words(100_000), 3),
+    "trigram_train/frost": (trigram_train(), 10),
+    "trigram_train/frost-x20": (trigram_train(20), 3),
+    "hmm_train/frost": (hmm_train(), 10),
+    "hmm_train/frost-x20": (hmm_train(20), 3),
+    "poem/generate_poem": (poem_generate, 200),
+    "poem2/generate_poem": (poem2_generate, 200),
+    "frost_markov/build_poem": (markov_build_poem, 100),
+    "frost_hmm/generate_poem": (hmm_generate, 100),
+    "medium/build_chain": (medium_chain, 50),
+}
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+
+def peak_rss_mib():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_case(name: str, seed: int, scale: float) -> dict:
+    """Time one case in this process; called in the child interpreter."""
+    setup, ops = CASES[name]
+    ops = max(1, round(ops * scale))
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    random.seed(seed)
+    latencies = []
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            op = setup(tmp, seed)
+            op()  # warm-up: lazy imports, rhyme indexes, page cache
+            started = time.perf_counter()
+            for _ in range(ops):
+                t = time.perf_counter()
+                op()
+                latencies.append(time.perf_counter() - t)
+            elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops": ops,
+        "ops_per_s": ops / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def spawn_case(name: str, seed: int, scale: float) -> dict:
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-case", name,
+         "--seed", str(seed), "--scale", str(scale)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        # The exception is the last unindented line; nltk continues its message below
+        lines = result.stderr.splitlines()
+        starts = [i for i, line in enumerate(lines) if line[:1].isalpha()]
+        if not starts:
+            return {"error": f"exit status {result.returncode}"}
+        message = " ".join(line.strip("* ") for line in lines[starts[-1]:])
+        return {"error": " ".join(message.split())[:80]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def regressions(result: dict, base: dict, tolerance: float):
+    found = []
+    if result["ops_per_s"] < base["ops_per_s"] * (1 - tolerance):
+        found.append("ops/s")
+    if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+        found.append("p99")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput, latency and peak RSS of loaders, trainers and generators")
+    parser.add_argument("filters", nargs="*", help="Only run cases whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the number of timed operations")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against results saved with --save-baseline")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the results as JSON to FILE")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown before flagging a regression")
+    parser.add_argument("--run-case", metavar="NAME", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.seed, args.scale)))
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+
+    names = [n for n in CASES if not args.filters or any(f in n for f in args.filters)]
+    results = {}
+    regressed = []
+    print(f"{'case':<26} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'RSS MiB':>8}  vs baseline")
+    for name in names:
+        result = results[name] = spawn_case(name, args.seed, args.scale)
+        if "error" in result:
+            print(f"{name:<26} error: {result['error']}")
+            continue
+        rss = result["peak_rss_mib"]
+        line = (
+            f"{name:<26} {result['ops_per_s']:>10.1f} {result['p50_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {rss if rss is None else format(rss, '.1f'):>8}"
+        )
+        base = baseline.get(name)
+        if base and "error" not in base:
+            change = result["ops_per_s"] / base["ops_per_s"] - 1
+            line += f"  {change:+.1%} ops/s"
+            slower = regressions(result, base, args.tolerance)
+            if slower:
+                regressed.append(name)
+                line += "  REGRESSION (" + ", ".join(slower) + ")"
+        print(line)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "scale": args.scale, "python": sys.version.split()[0], "cases": results}, f, indent=2)
+    if regressed:
+        print(f"\n{len(regressed)} regression(s): {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
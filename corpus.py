@@ -0,0 +1,123 @@
+"""Streaming corpus reader shared by the Frost models.
+
+Corpora are read in line-aligned chunks and split into sentences chunk by
+chunk, so memory stays bounded by the chunk size and the longest sentence
+rather than by the corpus. The sentence splitter is passed in (e.g.
+``nltk.sent_tokenize``); the last sentence of every chunk is held back and
+re-split with the next chunk, so sentences spanning a chunk boundary come
+out whole. Corpus arguments may be a path, a glob, or any iterable of them.
+
+For multi-core training, ``shards`` batches the sentences and
+``map_shards`` counts each batch in a process pool; the models merge the
+partial counts in corpus order, so the result matches serial training.
+"""
+
+import glob
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar, Union
+
+Paths = Union[str, Iterable[str]]
+T = TypeVar("T")
+
+# Characters read per chunk
+CHUNK_SIZE = 1 << 20
+# Sentences per training shard
+SHARD_SIZE = 2000
+
+_DASHES = re.compile(r"[\u2010-\u2015]")
+
+
+def expand_paths(paths: Paths) -> List[str]:
+    """Expand a path, glob, or iterable of them into a list of files, in order."""
+    if isinstance(paths, str):
+        paths = [paths]
+    expanded = []
+    for pattern in paths:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches or not os.path.exists(matches[0]):
+            raise FileNotFoundError(f"Corpus file '{pattern}' not found")
+        expanded.extend(matches)
+    return expanded
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the text of ``path`` in chunks of at least ``chunk_size`` characters ending at a newline."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines: List[str] = []
+        size = 0
+        for line in f:
+            lines.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield "".join(lines)
+                lines, size = [], 0
+        if lines:
+            yield "".join(lines)
+
+
+def iter_sentences(
+    paths: Paths,
+    split: Callable[[str], List[str]],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield the sentences of every corpus file, with dashes normalised to "-"."""
+    for path in expand_paths(paths):
+        carry = ""
+        for chunk in read_chunks(path, chunk_size):
+            chunk = _DASHES.sub("-", chunk)
+            # Chunks end at a newline, which is put back between the carry and the next chunk
+            sentences = split(carry + "\n" + chunk if carry else chunk)
+            carry = sentences.pop().rstrip() if sentences else ""
+            yield from sentences
+            if len(carry) > chunk_size:
+                # No sentence break in a whole chunk; don't let the carry grow
+                yield carry
+                carry = ""
+        if carry:
+            yield carry
+
+
+def shards(sentences: Iterable[str], shard_size: int = SHARD_SIZE) -> Iterator[List[str]]:
+    """Batch a sentence stream into lists of ``shard_size`` sentences."""
+    shard: List[str] = []
+    for sentence in sentences:
+        shard.append(sentence)
+        if len(shard) >= shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def map_shards(func: Callable[[List[str]], T], shard_iter: Iterable[List[str]], workers: Optional[int] = None) -> Iterator[T]:
+    """Yield ``func(shard)`` for every shard, in order, computed in a process pool.
+
+    ``func`` must be a picklable module-level function. ``workers`` defaults
+    to one per CPU; 1, or a corpus with a single shard, runs in this process.
+    At most a few shards per worker are in flight, so the corpus is never
+    held in memory at once.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shard_iter = iter(shard_iter)
+    first = next(shard_iter, None)
+    second = next(shard_iter, None) if first is not None else None
+    if workers == 1 or second is None:
+        for shard in (first, second):
+            if shard is not None:
+                yield func(shard)
+        yield from map(func, shard_iter)
+        return
+
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque([pool.submit(func, first), pool.submit(func, second)])
+        for shard in shard_iter:
+            pending.append(pool.submit(func, shard))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
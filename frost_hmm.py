@@ -1,16 +1,27 @@
-import os
+import mmap
 import random
 import re
 from collections import defaultdict, Counter
-from typing import List, Tuple
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-import nltk
-from nltk import word_tokenize, pos_tag
-from nltk.util import bigrams
-import pronouncing
+from artifacts import file_hash, load_artifact, read_meta, save_artifact
+from corpus import CHUNK_SIZE, Paths, expand_paths, iter_sentences, map_shards, shards
+from metrics import Metrics
+from rhyme_index import RhymeIndex
+from sampling import AliasTable
 
-# Make sure the required nltk resources are available
+# nltk and pronouncing are slow to import, so nltk is only loaded when
+# training needs tokenization/tagging and pronouncing when a RhymeIndex is built.
+_nltk_checked = False
+
+# Make sure the required nltk resources are available (checked once per process)
 def _ensure_nltk_downloads():
+    global _nltk_checked
+    import nltk
+
+    if _nltk_checked:
+        return nltk
     required = ["punkt", "averaged_perceptron_tagger", "punkt_tab"]
     for res in required:
         try:
@@ -23,75 +34,196 @@ def _ensure_nltk_downloads():
         except LookupError:
             print(f"Downloading {res}...")
             nltk.download(res, quiet=True)
-
-_ensure_nltk_downloads()
+    _nltk_checked = True
+    return nltk
 
 #############################
 # Data loading & preprocessing
 #############################
 
-def load_corpus(path: str) -> List[List[Tuple[str, str]]]:
-    """Load a corpus from a text file, returning a list of POS-tagged sentences.
+_HAS_LETTER = re.compile(r"[A-Za-z]")
 
-    Each sentence is a list of (word, POS) tuples.
-    """
-    if not os.path.exists(path):
-        raise FileNotFoundError(
-            f"Corpus file '{path}' not found. Please place a Robert Frost poem corpus there."
-        )
 
-    # Read raw text and split into sentences (very naive – can be improved)
-    with open(path, "r", encoding="utf-8") as f:
-        raw = f.read()
+def iter_corpus(corpus: Paths, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Tuple[str, str]]]:
+    """Stream POS-tagged sentences from a corpus path, glob, or list of them.
 
-    # Replace fancy quotes/dashes etc.
-    raw = re.sub(r"[\u2010-\u2015]", "-", raw)
+    Each sentence is a list of (word, POS) tuples. Files are read in chunks,
+    so memory does not grow with the corpus.
+    """
+    paths = expand_paths(corpus)
+    nltk = _ensure_nltk_downloads()
+    yield from _tag_sentences(nltk, iter_sentences(paths, nltk.sent_tokenize, chunk_size))
 
-    sentences = nltk.sent_tokenize(raw)
-    tagged_sentences: List[List[Tuple[str, str]]] = []
+
+def _tag_sentences(nltk, sentences: Iterable[str]) -> Iterator[List[Tuple[str, str]]]:
     for sent in sentences:
-        tokens = word_tokenize(sent)
         # Filter out purely punctuation tokens because they confuse the model
-        tokens = [t for t in tokens if re.search(r"[A-Za-z]", t)]
-        if not tokens:
-            continue
-        tagged = pos_tag(tokens)
-        tagged_sentences.append(tagged)
-    return tagged_sentences
+        tokens = [t for t in nltk.word_tokenize(sent) if _HAS_LETTER.search(t)]
+        if tokens:
+            yield nltk.pos_tag(tokens)
+
+
+def load_corpus(corpus: Paths) -> List[List[Tuple[str, str]]]:
+    """Load a corpus into memory as a list of POS-tagged sentences; see ``iter_corpus``."""
+    return list(iter_corpus(corpus))
 
 #############################
 # Model training
 #############################
 
-class HiddenMarkovPoet:
-    """Very small HMM where hidden states are coarse-grained POS tags."""
+ARTIFACT_KIND = "hmm"
+
+class TagCounts:
+    """Raw start, transition and emission counts over coarse POS states.
+
+    Counts from separate shards of a corpus add up with ``merge``; they are
+    only turned into probabilities by HiddenMarkovPoet, which leaves them
+    intact.
+    """
 
     def __init__(self):
-        # Probability tables
+        self.start: Counter[str] = Counter()
         self.transition: defaultdict[str, Counter[str]] = defaultdict(Counter)
         self.emission: defaultdict[str, Counter[str]] = defaultdict(Counter)
-        self.start: Counter[str] = Counter()
 
-    def train(self, tagged_sentences: List[List[Tuple[str, str]]]):
+    def add(self, tagged_sentences: Iterable[List[Tuple[str, str]]]) -> "TagCounts":
         for sent in tagged_sentences:
             if not sent:
                 continue
             prev_state = None
             for (word, pos) in sent:
-                state = self._coarse_pos(pos)
+                state = HiddenMarkovPoet._coarse_pos(pos)
                 self.emission[state][word.lower()] += 1
                 if prev_state is None:
                     self.start[state] += 1
                 else:
                     self.transition[prev_state][state] += 1
                 prev_state = state
+        return self
+
+    def merge(self, other: "TagCounts") -> "TagCounts":
+        self.start.update(other.start)
+        for state, counter in other.transition.items():
+            self.transition[state].update(counter)
+        for state, counter in other.emission.items():
+            self.emission[state].update(counter)
+        return self
+
 
-        # Convert to probabilities (with add-one smoothing)
-        self._normalise_counters(self.start)
-        for state, counter in self.transition.items():
-            self._normalise_counters(counter)
-        for state, counter in self.emission.items():
-            self._normalise_counters(counter)
+def _count_shard(sentences: List[str]) -> TagCounts:
+    """Tokenize, tag and count one shard of sentences in a pool worker."""
+    return TagCounts().add(_tag_sentences(_ensure_nltk_downloads(), sentences))
+
+
+class HiddenMarkovPoet:
+    """Very small HMM where hidden states are coarse-grained POS tags."""
+
+    # Hidden states, in state-id order
+    STATES = ("NOUN", "VERB", "ADJ", "ADV", "OTHER")
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        # Raw counts, kept so more text can be added and the tables rebuilt
+        self.counts = TagCounts()
+        # Probability tables, derived from the counts by _normalise()
+        self.transition: Dict[str, Dict[str, float]] = {}
+        self.emission: Dict[str, Dict[str, float]] = {}
+        self.start: Dict[str, float] = {}
+        # Interned emission vocabulary and compiled tables over state/word ids,
+        # built by compile() or mapped from an artifact by load(). The start
+        # table has row 0; transition and emission rows are keyed by state id.
+        self.vocab: List[str] = []
+        self.start_table = AliasTable.build({})
+        self.transition_table = AliasTable.build({})
+        self.emission_table = AliasTable.build({})
+        self.corpus_hash: Optional[str] = None
+        self._rhyme_index: Optional[RhymeIndex] = None
+        # word -> ids of the states that emit it, built on first use
+        self._word_states: Optional[Dict[str, frozenset]] = None
+        self._mapped: Optional[mmap.mmap] = None
+        self.rng = rng if rng is not None else random
+
+    @property
+    def rhyme_index(self) -> RhymeIndex:
+        """CMUdict rhymes within the vocabulary, built on first use unless loaded."""
+        if self._rhyme_index is None:
+            self._rhyme_index = RhymeIndex.build(self.vocab)
+        return self._rhyme_index
+
+    def train(self, tagged_sentences: Iterable[List[Tuple[str, str]]]):
+        """Add POS-tagged sentences to the counts and rebuild the model."""
+        self.counts.add(tagged_sentences)
+        self._normalise()
+        self.compile()
+
+    def train_corpus(self, corpus: Paths, chunk_size: int = CHUNK_SIZE, workers: Optional[int] = 1):
+        """Train on a corpus path, glob, or list of them, streamed in chunks.
+
+        With ``workers`` other than 1 (None: one per CPU), shards of sentences
+        are tokenized, tagged and counted in a process pool and merged in
+        corpus order, which gives the same model as tagging serially.
+        """
+        nltk = _ensure_nltk_downloads()
+        sentences = iter_sentences(expand_paths(corpus), nltk.sent_tokenize, chunk_size)
+        for counts in map_shards(_count_shard, shards(sentences), workers):
+            self.counts.merge(counts)
+        self._normalise()
+        self.compile()
+
+    def _normalise(self):
+        """(Re)derive the probability tables from the raw counts."""
+        counts = self.counts
+        self.start = self._probabilities(counts.start)
+        self.transition = {state: self._probabilities(c) for state, c in counts.transition.items()}
+        self.emission = {state: self._probabilities(c) for state, c in counts.emission.items()}
+
+    def compile(self):
+        """(Re)build the vocabulary and compiled tables from the probability tables."""
+        state_ids = {state: i for i, state in enumerate(self.STATES)}
+        self._rhyme_index = None
+        self._word_states = None
+        self.vocab = list({w: None for counter in self.emission.values() for w in counter})
+        word_ids = {w: i for i, w in enumerate(self.vocab)}
+
+        self.start_table = AliasTable.build({0: {state_ids[s]: p for s, p in self.start.items()}})
+        self.transition_table = AliasTable.build({
+            state_ids[prev]: {state_ids[s]: p for s, p in counter.items()}
+            for prev, counter in self.transition.items()
+        })
+        self.emission_table = AliasTable.build({
+            state_ids[state]: {word_ids[w]: p for w, p in counter.items()}
+            for state, counter in self.emission.items()
+        })
+
+    def save(self, path: str, corpus_hash: Optional[str] = None):
+        """Write the compiled model and its rhyme index to ``path``; see ``load``."""
+        meta = {
+            "vocab": self.vocab,
+            "states": list(self.STATES),
+            "corpus_hash": corpus_hash if corpus_hash is not None else self.corpus_hash,
+        }
+        tables = {
+            "start": self.start_table,
+            "transition": self.transition_table,
+            "emission": self.emission_table,
+        }
+        tables.update(self.rhyme_index.tables())
+        save_artifact(path, ARTIFACT_KIND, meta, tables)
+
+    @classmethod
+    def load(cls, path: str, rng: Optional[random.Random] = None) -> "HiddenMarkovPoet":
+        """Map a saved model. It can generate but not be trained further."""
+        meta, tables, mapped = load_artifact(path, ARTIFACT_KIND)
+        if tuple(meta["states"]) != cls.STATES:
+            raise ValueError("artifact was saved with a different state set")
+        poet = cls(rng=rng)
+        poet.vocab = meta["vocab"]
+        poet.start_table = tables["start"]
+        poet.transition_table = tables["transition"]
+        poet.emission_table = tables["emission"]
+        poet._rhyme_index = RhymeIndex.from_tables(poet.vocab, tables)
+        poet.corpus_hash = meta["corpus_hash"]
+        poet._mapped = mapped
+        return poet
 
     @staticmethod
     def _coarse_pos(pos: str) -> str:
@@ -107,45 +239,99 @@ class HiddenMarkovPoet:
         return "OTHER"
 
     @staticmethod
-    def _normalise_counters(counter: Counter[str]):
+    def _probabilities(counter: Counter[str]) -> Dict[str, float]:
         total = sum(counter.values())
-        for k in list(counter):
-            counter[k] = counter[k] / total
+        return {k: count / total for k, count in counter.items()}
 
     #############################
     # Generation helpers
     #############################
 
-    def _sample(self, distribution: Counter[str]) -> str:
-        r = random.random()
-        cumulative = 0.0
-        for item, prob in distribution.items():
-            cumulative += prob
-            if r <= cumulative:
-                return item
-        # Fallback (shouldn't happen due to numerical issues)
-        return random.choice(list(distribution))
-
-    def generate_sentence(self, max_len: int = 12) -> List[str]:
-        sentence_states: List[str] = []
+    def _sample(self, table: AliasTable, key: int, rng: Optional[random.Random] = None) -> int:
+        """Draw an item id from ``table``'s row for ``key``, or -1 if it has none."""
+        row = table.find(key)
+        if row < 0:
+            return -1
+        return table.sample(row, rng or self.rng)
+
+    def _next_state(
+        self, prev_state: int, metrics: Optional[Metrics] = None, rng: Optional[random.Random] = None
+    ) -> int:
+        state = self._sample(self.transition_table, prev_state, rng)
+        if state < 0:
+            # State only ever seen at the end of a sentence; restart
+            if metrics is not None:
+                metrics.incr("backoffs_to_start")
+            state = self._sample(self.start_table, 0, rng)
+        return state
+
+    def _states_emitting(self, word: str) -> frozenset:
+        if self._word_states is None:
+            word_states: defaultdict[str, set] = defaultdict(set)
+            table = self.emission_table
+            for row, state in enumerate(table.keys):
+                for word_id in table.row_items(row):
+                    word_states[self.vocab[word_id]].add(state)
+            self._word_states = {w: frozenset(states) for w, states in word_states.items()}
+        return self._word_states.get(word, frozenset())
+
+    def generate_sentence(
+        self, max_len: int = 12, metrics: Optional[Metrics] = None, rng: Optional[random.Random] = None
+    ) -> List[str]:
+        return self._generate(max_len, metrics, rng)[1]
+
+    def _generate(
+        self, max_len: int, metrics: Optional[Metrics] = None, rng: Optional[random.Random] = None
+    ) -> Tuple[List[int], List[str]]:
+        rng = rng or self.rng
+        sentence_states: List[int] = []
         sentence_words: List[str] = []
 
-        first_state = self._sample(self.start)
+        first_state = self._sample(self.start_table, 0, rng)
         sentence_states.append(first_state)
-        word = self._sample(self.emission[first_state])
+        word = self.vocab[self._sample(self.emission_table, first_state, rng)]
         sentence_words.append(word)
 
         while len(sentence_words) < max_len:
             prev_state = sentence_states[-1]
-            next_state = self._sample(self.transition[prev_state])
+            next_state = self._next_state(prev_state, metrics, rng)
             sentence_states.append(next_state)
-            next_word = self._sample(self.emission[next_state])
+            next_word = self.vocab[self._sample(self.emission_table, next_state, rng)]
             sentence_words.append(next_word)
 
             # Occasionally end early if last word ends with period or we reach length
-            if len(sentence_words) >= 5 and random.random() < 0.2:
+            if len(sentence_words) >= 5 and rng.random() < 0.2:
                 break
-        return sentence_words
+        return sentence_states, sentence_words
+
+    def generate_sentence_ending(
+        self,
+        last_word: str,
+        max_len: int = 12,
+        attempts: int = 8,
+        metrics: Optional[Metrics] = None,
+        rng: Optional[random.Random] = None,
+    ) -> Optional[List[str]]:
+        """Generate a sentence ending in ``last_word``.
+
+        A prefix is sampled and kept once the state after it can emit
+        ``last_word``; after ``attempts`` rejections the last prefix is used.
+        Returns None if the model never emitted ``last_word``.
+        """
+        word_states = self._states_emitting(last_word)
+        if not word_states:
+            return None
+        if metrics is None:
+            metrics = Metrics()
+        for _ in range(attempts):
+            metrics.incr("rhyme_attempts")
+            states, words = self._generate(max(max_len - 1, 1), metrics, rng)
+            if self._next_state(states[-1], metrics, rng) in word_states:
+                metrics.incr("rhyme_successes")
+                break
+        else:
+            metrics.incr("rhyme_failures")
+        return words + [last_word]
 
     #############################
     # Poem generation interface
@@ -157,13 +343,25 @@ class HiddenMarkovPoet:
         max_len: int = 12,
         rhyme: bool = True,
         rhyme_scheme: str = "AABB",
+        metrics: Optional[Metrics] = None,
+        rng: Optional[random.Random] = None,
     ) -> List[str]:
         """Generate a poem of n_lines lines.
 
         rhyme_scheme should be something like "AABB" (repeated to length) or "ABAB".
+        Counters and stage timings are recorded into metrics, if given. Draws
+        from rng instead of self.rng when given.
         """
+        rng = rng or self.rng
+        if metrics is None:
+            metrics = Metrics()
+        metrics.incr("poems")
+        started = perf_counter()
         if not rhyme:
-            return [" ".join(self.generate_sentence(max_len)).capitalize() for _ in range(n_lines)]
+            with metrics.stage("slot_filling"):
+                lines = [" ".join(self.generate_sentence(max_len, metrics, rng)).capitalize() for _ in range(n_lines)]
+            metrics.add_time("poem", perf_counter() - started)
+            return lines
 
         # Build mapping letter -> list of words that rhyme
         scheme_letters = (rhyme_scheme * ((n_lines // len(rhyme_scheme)) + 1))[:n_lines]
@@ -177,31 +375,39 @@ class HiddenMarkovPoet:
         for letter, indices in groups.items():
             # Generate a line, pick last word, then generate rhymes for the rest
             anchor_line = indices[0]
-            words = self.generate_sentence(max_len)
-            anchor_last = self._pick_rhymeable_word(words)
-            words[-1] = anchor_last
-            lines[anchor_line] = " ".join(words).capitalize()
+            with metrics.stage("slot_filling"):
+                words = self.generate_sentence(max_len, metrics, rng)
+            with metrics.stage("rhyme_search"):
+                # End the anchor line on its last rhymeable word
+                words = words[:self._pick_rhymeable_index(words) + 1]
+                anchor_last = words[-1]
+                # Fill rest with rhymes
+                rhymes = self.rhyme_index.rhymes(anchor_last)
+                if not rhymes:
+                    rhymes = [anchor_last]
+            metrics.observe("rhyme_candidates", len(rhymes))
+            with metrics.stage("post_processing"):
+                lines[anchor_line] = " ".join(words).capitalize()
             line_end_words[letter] = anchor_last
 
-            # Fill rest with rhymes
-            rhymes = pronouncing.rhymes(anchor_last)
-            if not rhymes:
-                rhymes = [anchor_last]
-
             for idx in indices[1:]:
-                candidate_rhyme = random.choice(rhymes)
-                sent = self.generate_sentence(max_len)
-                sent[-1] = candidate_rhyme
-                lines[idx] = " ".join(sent).capitalize()
-
+                # Rhymes all come from the vocabulary, so the line can be built
+                # to end on the rhyme instead of patching a free sentence
+                candidate_rhyme = rng.choice(rhymes)
+                with metrics.stage("slot_filling"):
+                    sent = self.generate_sentence_ending(candidate_rhyme, max_len, metrics=metrics, rng=rng)
+                with metrics.stage("post_processing"):
+                    lines[idx] = " ".join(sent).capitalize()
+
+        metrics.add_time("poem", perf_counter() - started)
         return lines
 
-    def _pick_rhymeable_word(self, words: List[str]) -> str:
-        # Choose a word with available rhymes; fallback to last word
-        for w in reversed(words):
-            if pronouncing.rhymes(w):
-                return w
-        return words[-1]
+    def _pick_rhymeable_index(self, words: List[str]) -> int:
+        # Choose the last word with available rhymes; fallback to last word
+        for i in range(len(words) - 1, -1, -1):
+            if self.rhyme_index.has_rhymes(words[i]):
+                return i
+        return len(words) - 1
 
 #############################
 # Convenience CLI usage
@@ -209,21 +415,40 @@ class HiddenMarkovPoet:
 
 def main():
     import argparse
+    import contextlib
 
     parser = argparse.ArgumentParser(description="Generate Robert Frost-style poems using an HMM")
-    parser.add_argument("corpus", help="Path to a text file containing Robert Frost poems")
+    parser.add_argument("corpus", nargs="+", help="Text files or globs containing Robert Frost poems")
     parser.add_argument("--lines", type=int, default=14, help="Number of lines in the poem")
     parser.add_argument("--scheme", default="AABB", help="Rhyme scheme, e.g. AABB or ABAB")
+    parser.add_argument("--model", help="Model artifact to reuse; retrained and rewritten when the corpus changes")
+    parser.add_argument("--workers", type=int, help="Training processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible output")
+    parser.add_argument("--metrics", action="store_true", help="Print counters and stage timings as JSON")
+    parser.add_argument("--profile", metavar="FILE", help="Write cProfile stats for the run to FILE")
     args = parser.parse_args()
 
-    tagged = load_corpus(args.corpus)
-    poet = HiddenMarkovPoet()
-    poet.train(tagged)
+    metrics = Metrics()
+    with metrics.profile(args.profile) if args.profile else contextlib.nullcontext():
+        with metrics.stage("loading"):
+            corpus = expand_paths(args.corpus)
+            corpus_hash = file_hash(corpus)
+            meta = read_meta(args.model, ARTIFACT_KIND) if args.model else None
+            if meta is not None and meta["corpus_hash"] == corpus_hash:
+                poet = HiddenMarkovPoet.load(args.model)
+            else:
+                poet = HiddenMarkovPoet()
+                poet.train_corpus(corpus, workers=args.workers)
+                if args.model:
+                    poet.save(args.model, corpus_hash=corpus_hash)
 
-    poem = poet.generate_poem(n_lines=args.lines, rhyme_scheme=args.scheme)
+        rng = random.Random(args.seed) if args.seed is not None else None
+        poem = poet.generate_poem(n_lines=args.lines, rhyme_scheme=args.scheme, metrics=metrics, rng=rng)
     print()
     for line in poem:
         print(line)
+    if args.metrics:
+        print(metrics.to_json(indent=2))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,78 +1,444 @@
-import os
+import mmap
 import random
 import re
+from array import array
 from collections import defaultdict, Counter
-from typing import List, Tuple
+from itertools import chain
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-import nltk
-from nltk import word_tokenize
-import pronouncing
+from artifacts import file_hash, load_artifact, read_meta, save_artifact
+from corpus import CHUNK_SIZE, Paths, expand_paths, iter_sentences, map_shards, shards
+from metrics import Metrics
+from rhyme_index import RhymeIndex
+from sampling import AliasTable
 
 
+# nltk and pronouncing are slow to import, so nltk is only loaded when
+# training needs tokenization and pronouncing when a RhymeIndex is built.
+_nltk_checked = False
+
 def _ensure_nltk():
-    try:
-        nltk.data.find("tokenizers/punkt")
-    except LookupError:
-        nltk.download("punkt", quiet=True)
+    """Import nltk and make sure its tokenizer data is present (checked once per process)."""
+    global _nltk_checked
+    import nltk
 
-_ensure_nltk()
+    if not _nltk_checked:
+        try:
+            nltk.data.find("tokenizers/punkt")
+        except LookupError:
+            nltk.download("punkt", quiet=True)
+        _nltk_checked = True
+    return nltk
 
 START = "<START>"
 END = "<END>"
+# START and END always get the first two word ids
+START_ID = 0
+END_ID = 1
+
+ARTIFACT_KIND = "trigram"
+
+# Word ids are packed ID_BITS apiece into 64-bit n-gram keys
+ID_BITS = 21
+ID_MASK = (1 << ID_BITS) - 1
+MAX_VOCAB = 1 << ID_BITS
+
+
+class NGramCounts:
+    """Counts of packed integer n-gram keys, held as parallel sorted arrays.
+
+    Added keys are buffered and folded into the arrays in batches, so a
+    distinct n-gram costs 12 bytes instead of a dict entry keyed by a tuple
+    of strings.
+    """
+
+    # Smallest batch folded into the sorted arrays at once
+    FLUSH_SIZE = 1 << 18
 
-class TrigramModel:
     def __init__(self):
-        # mapping (w1, w2) -> Counter of next words
-        self.model: defaultdict[Tuple[str, str], Counter[str]] = defaultdict(Counter)
+        self.keys = array("Q")
+        self.counts = array("I")
+        self._pending = array("Q")
+
+    def add(self, key: int):
+        self._pending.append(key)
+        # Growing the batch with the table keeps merging amortised O(n log n)
+        if len(self._pending) >= max(self.FLUSH_SIZE, len(self.keys)):
+            self.flush()
+
+    def flush(self):
+        """Fold buffered keys into the sorted arrays."""
+        if not self._pending:
+            return
+        batch = sorted(Counter(self._pending).items())
+        self._pending = array("Q")
+        self._merge(array("Q", (k for k, _ in batch)), array("I", (c for _, c in batch)))
+
+    def __len__(self) -> int:
+        self.flush()
+        return len(self.keys)
+
+    def _merge(self, keys: array, counts: array):
+        if not self.keys:
+            self.keys, self.counts = keys, counts
+            return
+        merged_keys = array("Q")
+        merged_counts = array("I")
+        a_keys, a_counts = self.keys, self.counts
+        i = j = 0
+        while i < len(a_keys) and j < len(keys):
+            if a_keys[i] < keys[j]:
+                merged_keys.append(a_keys[i])
+                merged_counts.append(a_counts[i])
+                i += 1
+            elif a_keys[i] > keys[j]:
+                merged_keys.append(keys[j])
+                merged_counts.append(counts[j])
+                j += 1
+            else:
+                merged_keys.append(keys[j])
+                merged_counts.append(a_counts[i] + counts[j])
+                i += 1
+                j += 1
+        merged_keys.extend(a_keys[i:])
+        merged_counts.extend(a_counts[i:])
+        merged_keys.extend(keys[j:])
+        merged_counts.extend(counts[j:])
+        self.keys, self.counts = merged_keys, merged_counts
 
-    def train(self, corpus_path: str):
-        if not os.path.exists(corpus_path):
-            raise FileNotFoundError(corpus_path)
+    def merge(self, other: "NGramCounts", order: int, id_map: Sequence[int]):
+        """Add ``other``'s counts of ``order``-grams, translating its word ids through ``id_map``."""
+        other.flush()
+        pairs = []
+        for key, count in zip(other.keys, other.counts):
+            mapped = 0
+            for shift in range(0, order * ID_BITS, ID_BITS):
+                mapped |= id_map[(key >> shift) & ID_MASK] << shift
+            pairs.append((mapped, count))
+        pairs.sort()
+        self._merge(array("Q", (key for key, _ in pairs)), array("I", (count for _, count in pairs)))
 
-        with open(corpus_path, "r", encoding="utf-8") as f:
-            text = f.read()
+    def reversed(self, order: int) -> "NGramCounts":
+        """Return a copy whose keys hold their ``order`` word ids in reverse order."""
+        self.flush()
+        pairs = []
+        for key, count in zip(self.keys, self.counts):
+            reversed_key = 0
+            for _ in range(order):
+                reversed_key = (reversed_key << ID_BITS) | (key & ID_MASK)
+                key >>= ID_BITS
+            pairs.append((reversed_key, count))
+        pairs.sort()
+        result = NGramCounts()
+        result.keys = array("Q", (key for key, _ in pairs))
+        result.counts = array("I", (count for _, count in pairs))
+        return result
 
-        # normalise dashes/quotes and convert to lowercase
-        text = re.sub(r"[\u2010-\u2015]", "-", text)
-        sentences = nltk.sent_tokenize(text)
+    def groups(self) -> Iterator[Tuple[int, List[int], List[int]]]:
+        """Yield ``(context, last ids, counts)`` for each run of keys sharing everything but the last id."""
+        self.flush()
+        context = None
+        items: List[int] = []
+        counts: List[int] = []
+        for key, count in zip(self.keys, self.counts):
+            key_context = key >> ID_BITS
+            if key_context != context:
+                if items:
+                    yield context, items, counts
+                context, items, counts = key_context, [], []
+            items.append(key & ID_MASK)
+            counts.append(count)
+        if items:
+            yield context, items, counts
 
+
+class TrigramModel:
+    """Trigram model that backs off to bigram and unigram tables for unseen contexts.
+
+    Words are interned to integer ids and n-grams are counted as packed
+    64-bit keys (see NGramCounts). With ``discount`` > 0, every seen context
+    gives up ``discount`` of each successor count to the next order down
+    (interpolated absolute discounting), and the unigram table uses
+    Kneser-Ney continuation counts.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, discount: float = 0.0):
+        if not 0.0 <= discount < 1.0:
+            raise ValueError("discount must be in [0, 1)")
+        self.discount = discount
+        # interned vocabulary; START and END are always present
+        self.vocab: List[str] = [START, END]
+        self.word_ids: Dict[str, int] = {START: START_ID, END: END_ID}
+        # raw counts: (w1, w2, w3) and (w2, w3) packed keys, and w3 by id
+        self.trigram_counts = NGramCounts()
+        self.bigram_counts = NGramCounts()
+        self.unigram_counts = array("I", [0, 0])
+        # compiled tables over word ids, built by compile() or mapped from an
+        # artifact by load(). Trigram rows are keyed by (w1 << ID_BITS) | w2,
+        # bigram rows by w2, and the unigram table has row 0 over every word
+        # and row 1 without START and END, drawn from at a sentence start. The
+        # reverse tables sample a word's predecessor: reverse trigram rows are
+        # keyed by (w3 << ID_BITS) | w2 and give w1, reverse bigram rows are
+        # keyed by w2 and give w1.
+        self.trigram_table = AliasTable.build({})
+        self.bigram_table = AliasTable.build({})
+        self.unigram_table = AliasTable.build({})
+        self.reverse_trigram_table = AliasTable.build({})
+        self.reverse_bigram_table = AliasTable.build({})
+        self.corpus_hash: Optional[str] = None
+        self._rhyme_index: Optional[RhymeIndex] = None
+        self._mapped: Optional[mmap.mmap] = None
+        self.rng = rng if rng is not None else random
+
+    @property
+    def rhyme_index(self) -> RhymeIndex:
+        """CMUdict rhymes within the vocabulary, built on first use unless loaded."""
+        if self._rhyme_index is None:
+            self._rhyme_index = RhymeIndex.build(self.vocab, self.word_ids)
+        return self._rhyme_index
+
+    def _intern(self, word: str) -> int:
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.vocab)
+            if word_id >= MAX_VOCAB:
+                raise ValueError(f"vocabulary exceeds {MAX_VOCAB} words")
+            self.vocab.append(word)
+            self.word_ids[word] = word_id
+            self.unigram_counts.append(0)
+        return word_id
+
+    def train(self, corpus: Paths, chunk_size: int = CHUNK_SIZE, workers: Optional[int] = 1):
+        """Count n-grams over a corpus path, glob, or list of them, streamed in chunks.
+
+        With ``workers`` other than 1 (None: one per CPU), shards of sentences
+        are tokenized and counted in a process pool and merged in corpus
+        order, which gives the same model as counting serially.
+        """
+        nltk = _ensure_nltk()
+        sentences = iter_sentences(corpus, nltk.sent_tokenize, chunk_size)
+        if workers == 1:
+            self._count(nltk, sentences)
+        else:
+            for counts in map_shards(_count_shard, shards(sentences), workers):
+                self.merge_counts(*counts)
+        self.compile()
+
+    def _count(self, nltk, sentences: Iterable[str]):
         for sentence in sentences:
-            tokens = [START, START] + word_tokenize(sentence.lower()) + [END]
-            for w1, w2, w3 in nltk.trigrams(tokens):
-                self.model[(w1, w2)][w3] += 1
-
-        # convert counters to probabilities
-        for key, counter in self.model.items():
-            total = sum(counter.values())
-            for word in counter:
-                counter[word] /= total
-
-    def _sample_next(self, context: Tuple[str, str]) -> str:
-        choices = self.model.get(context)
-        if not choices:
-            # unseen context, back off to any word after second token
-            return random.choice(list(self.model[(context[1],) + (random.choice(list(self.model.keys()))[1],)][0]))
-        r = random.random()
-        cumulative = 0.0
-        for word, prob in choices.items():
-            cumulative += prob
-            if r <= cumulative:
-                return word
-        return random.choice(list(choices))
-
-    def generate_sentence(self, max_len: int = 15) -> List[str]:
-        w1, w2 = START, START
+            w1, w2 = START_ID, START_ID
+            tokens = (self._intern(w) for w in nltk.word_tokenize(sentence.lower()))
+            for w3 in chain(tokens, (END_ID,)):
+                self.trigram_counts.add((((w1 << ID_BITS) | w2) << ID_BITS) | w3)
+                self.bigram_counts.add((w2 << ID_BITS) | w3)
+                self.unigram_counts[w3] += 1
+                w1, w2 = w2, w3
+
+    def raw_counts(self) -> Tuple[List[str], NGramCounts, NGramCounts, array]:
+        """Return the vocabulary and raw counts, in the form ``merge_counts`` takes."""
+        self.trigram_counts.flush()
+        self.bigram_counts.flush()
+        return self.vocab, self.trigram_counts, self.bigram_counts, self.unigram_counts
+
+    def merge_counts(self, vocab: List[str], trigram_counts: NGramCounts, bigram_counts: NGramCounts, unigram_counts: array):
+        """Add counts taken over another vocabulary (e.g. a training shard's) into this model.
+
+        Call ``compile`` afterwards to rebuild the tables.
+        """
+        id_map = [self._intern(w) for w in vocab]
+        for word_id, count in zip(id_map, unigram_counts):
+            self.unigram_counts[word_id] += count
+        self.trigram_counts.merge(trigram_counts, 3, id_map)
+        self.bigram_counts.merge(bigram_counts, 2, id_map)
+
+    def compile(self):
+        """(Re)build the compiled tables from the raw counts."""
+        self._rhyme_index = None
+        self.trigram_table = self._compile_table(self.trigram_counts)
+        self.bigram_table = self._compile_table(self.bigram_counts)
+
+        if self.discount:
+            # Kneser-Ney continuation counts: how many distinct words precede each word
+            unigram = array("I", bytes(len(self.unigram_counts) * 4))
+            for key in self.bigram_counts.keys:
+                unigram[key & ID_MASK] += 1
+        else:
+            unigram = self.unigram_counts
+        # A sentence can't end before its first word, so backoff from the start drops END
+        opening = array(unigram.typecode, unigram)
+        opening[START_ID] = opening[END_ID] = 0
+        self.unigram_table = AliasTable.build_groups([
+            (0, range(len(unigram)), unigram, 0.0),
+            (1, range(len(opening)), opening, 0.0),
+        ])
+
+        self.reverse_trigram_table = AliasTable.build_groups(
+            (context, items, weights, 0.0) for context, items, weights in self.trigram_counts.reversed(3).groups()
+        )
+        self.reverse_bigram_table = AliasTable.build_groups(
+            (context, items, weights, 0.0) for context, items, weights in self.bigram_counts.reversed(2).groups()
+        )
+
+    def _compile_table(self, counts: NGramCounts) -> AliasTable:
+        if not self.discount:
+            return AliasTable.build_groups(
+                (context, items, weights, 0.0) for context, items, weights in counts.groups()
+            )
+
+        def discounted():
+            for context, items, weights in counts.groups():
+                total = sum(weights)
+                backoff = self.discount * len(items) / total
+                yield context, items, [c - self.discount for c in weights], backoff
+
+        return AliasTable.build_groups(discounted())
+
+    def save(self, path: str, corpus_hash: Optional[str] = None):
+        """Write the compiled model and its rhyme index to ``path``; see ``load``."""
+        meta = {
+            "vocab": self.vocab,
+            "discount": self.discount,
+            "corpus_hash": corpus_hash if corpus_hash is not None else self.corpus_hash,
+        }
+        tables = {
+            "trigram": self.trigram_table,
+            "bigram": self.bigram_table,
+            "unigram": self.unigram_table,
+            "reverse_trigram": self.reverse_trigram_table,
+            "reverse_bigram": self.reverse_bigram_table,
+        }
+        tables.update(self.rhyme_index.tables())
+        save_artifact(path, ARTIFACT_KIND, meta, tables)
+
+    @classmethod
+    def load(cls, path: str, rng: Optional[random.Random] = None) -> "TrigramModel":
+        """Map a saved model. It can generate but not be trained further."""
+        meta, tables, mapped = load_artifact(path, ARTIFACT_KIND)
+        model = cls(rng=rng, discount=meta["discount"])
+        model.vocab = meta["vocab"]
+        model.word_ids = {w: i for i, w in enumerate(model.vocab)}
+        model.trigram_table = tables["trigram"]
+        model.bigram_table = tables["bigram"]
+        model.unigram_table = tables["unigram"]
+        model.reverse_trigram_table = tables["reverse_trigram"]
+        model.reverse_bigram_table = tables["reverse_bigram"]
+        model._rhyme_index = RhymeIndex.from_tables(model.vocab, tables, model.word_ids)
+        model.corpus_hash = meta["corpus_hash"]
+        model._mapped = mapped
+        return model
+
+    def _sample_next(self, context: Tuple[str, str], rng: Optional[random.Random] = None) -> str:
+        ids = self.word_ids
+        return self.vocab[self._sample_next_id(ids.get(context[0], -1), ids.get(context[1], -1), rng=rng)]
+
+    def _sample_next_id(
+        self, w1: int, w2: int, metrics: Optional[Metrics] = None, rng: Optional[random.Random] = None
+    ) -> int:
+        # trigram -> bigram -> unigram; lookups never insert into the tables
+        rng = rng or self.rng
+        if w1 >= 0 and w2 >= 0:
+            table = self.trigram_table
+            row = table.find((w1 << ID_BITS) | w2)
+            if row >= 0 and not self._backs_off(table.backoff[row], rng):
+                return table.sample(row, rng)
+            if metrics is not None:
+                metrics.incr("backoffs_to_bigram")
+        if w2 >= 0:
+            table = self.bigram_table
+            row = table.find(w2)
+            if row >= 0 and not self._backs_off(table.backoff[row], rng):
+                return table.sample(row, rng)
+        if metrics is not None:
+            metrics.incr("backoffs_to_unigram")
+        if not len(self.unigram_table):
+            return END_ID
+        row = self.unigram_table.find(1) if w2 == START_ID else -1
+        return self.unigram_table.sample(max(row, 0), rng)
+
+    @staticmethod
+    def _backs_off(weight: float, rng: random.Random) -> bool:
+        return weight > 0.0 and rng.random() < weight
+
+    def _sample_prev_id(
+        self, w2: int, w3: int, metrics: Optional[Metrics] = None, rng: Optional[random.Random] = None
+    ) -> int:
+        """Sample the word before ``w2`` given that ``w3`` follows it; START_ID if none was seen."""
+        rng = rng or self.rng
+        table = self.reverse_trigram_table
+        row = table.find((w3 << ID_BITS) | w2)
+        if row >= 0:
+            return table.sample(row, rng)
+        if metrics is not None:
+            metrics.incr("backoffs_to_bigram")
+        table = self.reverse_bigram_table
+        row = table.find(w2)
+        if row >= 0:
+            return table.sample(row, rng)
+        return START_ID
+
+    def generate_sentence(
+        self, max_len: int = 15, metrics: Optional[Metrics] = None, rng: Optional[random.Random] = None
+    ) -> List[str]:
+        w1, w2 = START_ID, START_ID
         sentence = []
         while True:
-            next_word = self._sample_next((w1, w2))
-            if next_word == END or len(sentence) >= max_len:
+            next_id = self._sample_next_id(w1, w2, metrics, rng)
+            if next_id == END_ID or len(sentence) >= max_len:
                 break
-            sentence.append(next_word)
-            w1, w2 = w2, next_word
+            sentence.append(self.vocab[next_id])
+            w1, w2 = w2, next_id
         return sentence
 
+    def generate_sentence_ending(
+        self,
+        last_word: str,
+        max_len: int = 15,
+        metrics: Optional[Metrics] = None,
+        rng: Optional[random.Random] = None,
+    ) -> Optional[List[str]]:
+        """Generate a sentence ending in ``last_word``, sampling right-to-left from it.
+
+        Returns None if ``last_word`` is not in the vocabulary.
+        """
+        last_id = self.word_ids.get(last_word)
+        if last_id is None or last_id in (START_ID, END_ID):
+            return None
+        sentence = [last_id]
+        w2, w3 = last_id, END_ID
+        while len(sentence) < max_len:
+            prev_id = self._sample_prev_id(w2, w3, metrics, rng)
+            if prev_id == START_ID:
+                break
+            sentence.append(prev_id)
+            w2, w3 = prev_id, w2
+        return [self.vocab[i] for i in reversed(sentence)]
+
 
-def build_poem(model: TrigramModel, n_lines: int = 14, scheme: str = "AABB") -> List[str]:
+def _count_shard(sentences: List[str]) -> Tuple[List[str], NGramCounts, NGramCounts, array]:
+    """Count one shard of sentences in a pool worker; see ``TrigramModel.train``."""
+    model = TrigramModel()
+    model._count(_ensure_nltk(), sentences)
+    return model.raw_counts()
+
+
+def build_poem(
+    model: TrigramModel,
+    n_lines: int = 14,
+    scheme: str = "AABB",
+    metrics: Optional[Metrics] = None,
+    rng: Optional[random.Random] = None,
+) -> List[str]:
+    """Generate ``n_lines`` lines rhyming by ``scheme``, recording stage timings into ``metrics``.
+
+    Draws from ``rng`` instead of the model's generator when given, so one
+    shared model can serve independent seeded streams.
+    """
+    rng = rng or model.rng
+    if metrics is None:
+        metrics = Metrics()
+    metrics.incr("poems")
+    started = perf_counter()
     scheme = (scheme * ((n_lines // len(scheme)) + 1))[:n_lines]
     groups: defaultdict[str, List[int]] = defaultdict(list)
     for idx, letter in enumerate(scheme):
@@ -81,24 +447,44 @@ def build_poem(model: TrigramModel, n_lines: int = 14, scheme: str = "AABB") ->
     lines = ["" for _ in range(n_lines)]
     for letter, idxs in groups.items():
         anchor_idx = idxs[0]
-        anchor_words = model.generate_sentence()
-        anchor_last = _pick_rhymeable(anchor_words)
-        anchor_words[-1] = anchor_last
-        lines[anchor_idx] = _beautify(anchor_words)
+        with metrics.stage("slot_filling"):
+            anchor_words = model.generate_sentence(metrics=metrics, rng=rng)
+        if not anchor_words:
+            # Only a model without words gives an empty sentence; leave the lines blank
+            metrics.incr("empty_sentences")
+            continue
+        with metrics.stage("rhyme_search"):
+            # End the anchor line on its last rhymeable word
+            anchor_words = anchor_words[:_pick_rhymeable(anchor_words, model.rhyme_index) + 1]
+            anchor_last = anchor_words[-1]
+            rhymes = model.rhyme_index.rhymes(anchor_last) or [anchor_last]
+        metrics.observe("rhyme_candidates", len(rhymes))
+        with metrics.stage("post_processing"):
+            lines[anchor_idx] = _beautify(anchor_words)
 
-        rhymes = pronouncing.rhymes(anchor_last) or [anchor_last]
         for i in idxs[1:]:
-            sent = model.generate_sentence()
-            sent[-1] = random.choice(rhymes)
-            lines[i] = _beautify(sent)
+            # Rhymes all come from the vocabulary, so the line can be generated
+            # backwards from the rhyme instead of patched onto a free sentence
+            with metrics.stage("slot_filling"):
+                sent = model.generate_sentence_ending(rng.choice(rhymes), metrics=metrics, rng=rng)
+                if sent is None:
+                    # The rhyme is out of vocabulary; fall back to a free sentence
+                    metrics.incr("rhyme_fallbacks")
+                    sent = model.generate_sentence(metrics=metrics, rng=rng)
+                    if not sent:
+                        metrics.incr("empty_sentences")
+            with metrics.stage("post_processing"):
+                lines[i] = _beautify(sent)
+    metrics.add_time("poem", perf_counter() - started)
     return lines
 
 
-def _pick_rhymeable(words: List[str]) -> str:
-    for w in reversed(words):
-        if pronouncing.rhymes(w):
-            return w
-    return words[-1]
+def _pick_rhymeable(words: List[str], rhyme_index: RhymeIndex) -> int:
+    """Return the index of the last word in ``words`` that has rhymes, else the last index."""
+    for i in range(len(words) - 1, -1, -1):
+        if rhyme_index.has_rhymes(words[i]):
+            return i
+    return len(words) - 1
 
 
 def _beautify(tokens: List[str]) -> str:
@@ -113,20 +499,39 @@ def _beautify(tokens: List[str]) -> str:
 
 def main():
     import argparse
+    import contextlib
 
     parser = argparse.ArgumentParser(description="Generate Robert Frost-style poems using a trigram Markov model")
-    parser.add_argument("corpus", help="Path to Frost corpus")
+    parser.add_argument("corpus", nargs="+", help="Frost corpus files or globs")
     parser.add_argument("--lines", type=int, default=14)
     parser.add_argument("--scheme", default="AABB")
+    parser.add_argument("--model", help="Model artifact to reuse; retrained and rewritten when the corpus changes")
+    parser.add_argument("--workers", type=int, help="Training processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible output")
+    parser.add_argument("--metrics", action="store_true", help="Print counters and stage timings as JSON")
+    parser.add_argument("--profile", metavar="FILE", help="Write cProfile stats for the run to FILE")
     args = parser.parse_args()
 
-    model = TrigramModel()
-    model.train(args.corpus)
-
-    poem = build_poem(model, n_lines=args.lines, scheme=args.scheme)
+    metrics = Metrics()
+    with metrics.profile(args.profile) if args.profile else contextlib.nullcontext():
+        with metrics.stage("loading"):
+            corpus = expand_paths(args.corpus)
+            corpus_hash = file_hash(corpus)
+            meta = read_meta(args.model, ARTIFACT_KIND) if args.model else None
+            if meta is not None and meta["corpus_hash"] == corpus_hash:
+                model = TrigramModel.load(args.model)
+            else:
+                model = TrigramModel()
+                model.train(corpus, workers=args.workers)
+                if args.model:
+                    model.save(args.model, corpus_hash=corpus_hash)
+        rng = random.Random(args.seed) if args.seed is not None else None
+        poem = build_poem(model, n_lines=args.lines, scheme=args.scheme, metrics=metrics, rng=rng)
     print()
     for line in poem:
         print(line)
+    if args.metrics:
+        print(metrics.to_json(indent=2))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""Word rules shared by the poem generators, built once into frozen tables.
+
+Covers which prepositions suit a verb, which words take "an" despite their
+spelling (and the reverse), which words end in "s" without being plural,
+and word morphology: irregular plurals and third-person singular verbs,
+with suffix rules for everything else.
+
+The built-in tables can be extended from an optional ``lexicon.txt`` next
+to this module (alongside words.txt and words2.txt), one rule per line in
+the word banks' colon-separated style; ``#`` starts a comment::
+
+    preposition:wander:through,across,around
+    silent_h:homage
+    consonant_u:unicorn
+    singular_s:lens
+    plural:cactus:cacti
+    third_person:veto:vetoes
+
+A ``preposition``, ``plural`` or ``third_person`` line replaces the
+built-in entry for that word.
+
+Word banks call ``inflect_all`` at load time so filling a slot looks up a
+word's forms instead of rewriting its suffix; ``inflect`` serves words
+outside the bank from a memo.
+"""
+
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Set, Tuple
+
+LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.txt")
+
+# Prepositions when there is no verb to go by
+BASIC_PREPOSITIONS = ('in', 'on', 'at', 'to', 'from', 'with', 'by', 'through')
+
+# Prepositions for verbs without a specific list
+GENERAL_PREPOSITIONS = (
+    'in', 'on', 'at', 'to', 'from', 'with', 'by', 'through',
+    'across', 'over', 'around', 'into', 'onto', 'off', 'up', 'down',
+)
+
+_AMBIENT = ('through', 'across', 'over', 'in')
+_GROWTH = ('in', 'through', 'across', 'over')
+
+_VERB_PREPOSITIONS = {
+    'jump': ('over', 'across', 'through', 'into', 'onto'),
+    'run': ('through', 'across', 'around', 'to', 'from'),
+    'walk': ('through', 'across', 'around', 'to', 'from'),
+    'fly': ('over', 'through', 'across', 'to', 'from'),
+    'swim': ('through', 'across', 'in', 'to', 'from'),
+    'climb': ('up', 'over', 'through', 'onto'),
+    'fall': ('off', 'from', 'through', 'into'),
+    'flow': ('through', 'across', 'into', 'over'),
+    'crash': ('into', 'through', 'against', 'onto'),
+    'shatter': ('into', 'against', 'through', 'onto'),
+    'speak': ('to', 'with', 'through', 'across'),
+    'listen': ('to', 'for', 'through', 'across'),
+    'watch': ('over', 'through', 'across', 'in'),
+    'hope': ('for', 'through', 'across', 'over'),
+    'dream': ('of', 'about', 'through', 'across'),
+    'think': ('about', 'of', 'through', 'across'),
+    'know': ('about', 'of', 'through', 'across'),
+    'learn': ('about', 'from', 'through', 'across'),
+    'teach': ('to', 'about', 'through', 'across'),
+}
+_VERB_PREPOSITIONS.update(dict.fromkeys((
+    'drift', 'float', 'burn', 'destroy', 'shine', 'glow', 'sparkle', 'twinkle', 'blaze',
+    'roar', 'rumble', 'howl', 'scream', 'whisper', 'wail', 'moan', 'groan',
+    'see', 'hear', 'feel', 'touch', 'love', 'hate', 'fear',
+), _AMBIENT))
+_VERB_PREPOSITIONS.update(dict.fromkeys(('grow', 'bloom', 'wilt', 'wither', 'fade'), _GROWTH))
+
+# Words starting with a silent h, which take "an"
+_SILENT_H_WORDS = {
+    'hour', 'honor', 'honest', 'heir', 'herb', 'herbal', 'historic', 'historical',
+    'hysterical', 'hysterically', 'hysterics', 'hysteric',
+}
+
+# Words starting with a "you" sound, which take "a"
+_CONSONANT_U_WORDS = {
+    'universal', 'university', 'uniform', 'union', 'unique', 'united', 'unity', 'universe',
+}
+
+# Singular words ending in "s"
+_SINGULAR_S_WORDS = {
+    'this', 'his', 'its', 'thus', 'plus', 'minus', 'status', 'campus', 'virus', 'chorus',
+    'bonus', 'census', 'focus', 'genius', 'radius', 'sinus', 'terminus', 'torus', 'viscus',
+    'apparatus', 'corpus', 'omnibus', 'prospectus', 'rebus', 'surplus', 'abacus', 'crocus',
+    'fungus', 'hippopotamus', 'octopus', 'platypus', 'rhinoceros', 'stadium', 'syllabus',
+    'uterus', 'villus', 'alumnus', 'bacillus', 'bronchus', 'locus', 'nucleus', 'stimulus',
+    'thesaurus', 'umbilicus',
+}
+
+_IRREGULAR_PLURALS = {
+    'man': 'men', 'woman': 'women', 'child': 'children', 'person': 'people',
+    'mouse': 'mice', 'louse': 'lice', 'goose': 'geese', 'foot': 'feet', 'tooth': 'teeth', 'ox': 'oxen',
+    'leaf': 'leaves', 'wolf': 'wolves', 'knife': 'knives', 'life': 'lives', 'wife': 'wives',
+    'loaf': 'loaves', 'thief': 'thieves', 'shelf': 'shelves', 'calf': 'calves', 'half': 'halves',
+    'elf': 'elves', 'self': 'selves', 'sheaf': 'sheaves',
+    'sheep': 'sheep', 'deer': 'deer', 'fish': 'fish', 'moose': 'moose', 'salmon': 'salmon',
+    'series': 'series', 'species': 'species',
+    'hero': 'heroes', 'echo': 'echoes', 'potato': 'potatoes', 'tomato': 'tomatoes', 'volcano': 'volcanoes',
+}
+
+_IRREGULAR_THIRD_PERSON = {
+    'be': 'is', 'have': 'has', 'do': 'does', 'go': 'goes', 'undergo': 'undergoes',
+    'echo': 'echoes', 'veto': 'vetoes',
+}
+
+
+def _read_lexicon_file(
+    path: str,
+    verb_prepositions: Dict[str, Tuple[str, ...]],
+    word_sets: Dict[str, Set[str]],
+    irregular: Dict[str, Dict[str, str]],
+):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            kind, _, rest = line.partition(':')
+            if kind == 'preposition':
+                verb, _, prepositions = rest.partition(':')
+                verb_prepositions[verb.lower()] = tuple(p.strip() for p in prepositions.split(',') if p.strip())
+            elif kind in word_sets:
+                word_sets[kind].add(rest.lower())
+            elif kind in irregular:
+                word, _, form = rest.partition(':')
+                irregular[kind][word.lower()] = form.strip()
+            else:
+                raise ValueError(f"{path}: unknown lexicon entry {line!r}")
+
+
+def _load(path: Optional[str]):
+    verb_prepositions = dict(_VERB_PREPOSITIONS)
+    word_sets = {
+        'silent_h': set(_SILENT_H_WORDS),
+        'consonant_u': set(_CONSONANT_U_WORDS),
+        'singular_s': set(_SINGULAR_S_WORDS),
+    }
+    irregular = {
+        'plural': dict(_IRREGULAR_PLURALS),
+        'third_person': dict(_IRREGULAR_THIRD_PERSON),
+    }
+    if path and os.path.exists(path):
+        _read_lexicon_file(path, verb_prepositions, word_sets, irregular)
+    return (
+        MappingProxyType(verb_prepositions),
+        frozenset(word_sets['silent_h']),
+        frozenset(word_sets['consonant_u']),
+        frozenset(word_sets['singular_s']),
+        MappingProxyType(irregular['plural']),
+        MappingProxyType(irregular['third_person']),
+    )
+
+
+(
+    VERB_PREPOSITIONS,
+    SILENT_H_WORDS,
+    CONSONANT_U_WORDS,
+    SINGULAR_S_WORDS,
+    IRREGULAR_PLURALS,
+    IRREGULAR_THIRD_PERSON,
+) = _load(LEXICON_FILE)
+
+# Irregular plurals that differ from their singular, e.g. "mice"
+_PLURAL_FORMS = frozenset(plural for word, plural in IRREGULAR_PLURALS.items() if plural != word)
+
+
+def prepositions_for(verb: Optional[str]) -> Tuple[str, ...]:
+    """Return the prepositions that may follow ``verb``."""
+    if not verb:
+        return BASIC_PREPOSITIONS
+    return VERB_PREPOSITIONS.get(verb.lower(), GENERAL_PREPOSITIONS)
+
+
+def indefinite_article(word: str) -> str:
+    """Return 'an' if ``word`` starts with a vowel sound, else 'a'."""
+    lowered = word.lower()
+    if lowered in SILENT_H_WORDS:
+        return 'an'
+    if lowered in CONSONANT_U_WORDS:
+        return 'a'
+    return 'an' if lowered[:1] in ('a', 'e', 'i', 'o', 'u') else 'a'
+
+
+def looks_plural(word: str) -> bool:
+    """Guess whether a noun is plural: it ends in "s" but not "ss" and is not a known singular."""
+    return word.endswith('s') and not word.endswith('ss') and word.lower() not in SINGULAR_S_WORDS
+
+
+def add_s(word: str) -> str:
+    """Apply the "-s"/"-es"/"-ies" suffix rule shared by plurals and third-person verbs."""
+    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        return word + 'es'
+    if word.endswith('y') and not word.endswith(('ay', 'ey', 'iy', 'oy', 'uy')):
+        return word[:-1] + 'ies'
+    return word + 's'
+
+
+class Forms(NamedTuple):
+    """Inflected forms of one word, and whether the word itself reads as plural."""
+
+    plural: str
+    third_person: str
+    is_plural: bool
+
+
+def _irregular(table: Mapping[str, str], word: str) -> Optional[str]:
+    form = table.get(word.lower())
+    if form is not None and word[:1].isupper():
+        form = form.capitalize()
+    return form
+
+
+@lru_cache(maxsize=4096)
+def inflect(word: str) -> Forms:
+    """Return the forms of ``word``: irregular overrides first, then the suffix rule."""
+    rule = add_s(word)
+    plural = _irregular(IRREGULAR_PLURALS, word) or rule
+    third_person = _irregular(IRREGULAR_THIRD_PERSON, word) or rule
+    return Forms(plural, third_person, word.lower() in _PLURAL_FORMS or looks_plural(word))
+
+
+def inflect_all(words: Iterable[str]) -> Mapping[str, Forms]:
+    """Precompute the forms of every word in a bank, as a read-only mapping."""
+    return MappingProxyType({word: inflect.__wrapped__(word) for word in words})
@@ -0,0 +1,150 @@
+"""Counters, stage timings and value summaries describing a generator's work.
+
+Generators take an optional ``metrics`` argument and record into it instead
+of printing: event counters (rhyme attempts, animacy rejections, back-off
+hits, ...), wall time per stage (loading, template selection, slot filling,
+rhyme search, post-processing, and the whole poem) and summaries of
+observed values such as candidate pool sizes. Pass one Metrics per poem to
+find slow poems, or share one across a batch; metrics from worker
+processes are combined with ``merge``.
+
+``snapshot`` returns a plain dict and ``to_json`` serialises it. For a
+function-level breakdown, wrap generation in ``profile``::
+
+    metrics = Metrics()
+    with metrics.profile("poem.prof"):
+        generate_poem(words, metrics=metrics)
+    print(metrics.to_json(indent=2))
+"""
+
+import cProfile
+import json
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, Mapping, Optional, Union
+
+
+class _Stage:
+    """Context manager adding the time spent in its block to a stage."""
+
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.name, perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    """Named counters, stage timings and value summaries for one poem or a batch."""
+
+    __slots__ = ("counters", "timings", "values")
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        # stage -> [calls, total seconds, slowest call]
+        self.timings: Dict[str, list] = {}
+        # name -> [count, total, min, max]
+        self.values: Dict[str, list] = {}
+
+    def incr(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def stage(self, name: str) -> _Stage:
+        """Time a block: ``with metrics.stage("slot_filling"): ...``"""
+        return _Stage(self, name)
+
+    def add_time(self, name: str, seconds: float):
+        timing = self.timings.get(name)
+        if timing is None:
+            self.timings[name] = [1, seconds, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+    def observe(self, name: str, value: float):
+        """Record one observation of a value, e.g. a candidate pool size."""
+        summary = self.values.get(name)
+        if summary is None:
+            self.values[name] = [1, value, value, value]
+        else:
+            summary[0] += 1
+            summary[1] += value
+            if value < summary[2]:
+                summary[2] = value
+            if value > summary[3]:
+                summary[3] = value
+
+    def merge(self, other: Union["Metrics", Mapping[str, dict]], prefix: str = "") -> "Metrics":
+        """Add another Metrics (or a snapshot of one) into this one, with ``prefix`` before every name."""
+        if isinstance(other, Metrics):
+            other = other.snapshot()
+        self.counters.update({prefix + name: n for name, n in other.get("counters", {}).items()})
+        for name, timing in other.get("timings", {}).items():
+            name = prefix + name
+            current = self.timings.get(name)
+            if current is None:
+                self.timings[name] = [timing["calls"], timing["total_s"], timing["max_s"]]
+            else:
+                current[0] += timing["calls"]
+                current[1] += timing["total_s"]
+                current[2] = max(current[2], timing["max_s"])
+        for name, summary in other.get("values", {}).items():
+            name = prefix + name
+            current = self.values.get(name)
+            if current is None:
+                self.values[name] = [summary["count"], summary["total"], summary["min"], summary["max"]]
+            else:
+                current[0] += summary["count"]
+                current[1] += summary["total"]
+                current[2] = min(current[2], summary["min"])
+                current[3] = max(current[3], summary["max"])
+        return self
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return everything recorded as a plain, picklable, JSON-ready dict."""
+        return {
+            "counters": dict(self.counters),
+            "timings": {
+                name: {"calls": calls, "total_s": total, "mean_s": total / calls, "max_s": slowest}
+                for name, (calls, total, slowest) in self.timings.items()
+            },
+            "values": {
+                name: {"count": count, "total": total, "mean": total / count, "min": low, "max": high}
+                for name, (count, total, low, high) in self.values.items()
+            },
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
+
+    @contextmanager
+    def profile(self, path: Optional[str] = None) -> Iterator[cProfile.Profile]:
+        """Run the block under cProfile, writing the stats to ``path`` if given.
+
+        Yields the profiler, e.g. for ``pstats.Stats(profiler)``.
+        """
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            if path:
+                profiler.dump_stats(path)
+
+    def __getitem__(self, name: str) -> int:
+        return self.counters[name]
+
+    def __repr__(self) -> str:
+        return f"Metrics({self.snapshot()!r})"
@@ -1,12 +1,173 @@
+import logging
 import random
 import pronouncing
 import warnings
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+from time import perf_counter
+
+from lexicon import indefinite_article, inflect, inflect_all
+from metrics import Metrics
+
+# Per-line rhyme traces; silent unless logging is configured
+logger = logging.getLogger(__name__)
 
 # Suppress the pkg_resources deprecation warning from pronouncing
 warnings.filterwarnings("ignore", category=UserWarning, module='pronouncing')
 
-def load_word_bank(filename="words.txt"):
+FUNCTION_POS = ("interjection", "preposition", "conjunction", "article")
+
+class WordBank(Mapping):
+    """Read-only word -> tags mapping with lookup indexes built once at load time.
+
+    Behaves like the plain dict it wraps, so ``word_bank[word]``, ``in`` and
+    ``items()`` keep working, but selectors should query the indexes instead
+    of scanning every entry.
+    """
+
+    def __init__(self, entries):
+        self._entries = dict(entries)
+
+        by_pos = defaultdict(list)
+        by_category = defaultdict(list)
+        by_pos_category = defaultdict(list)
+        by_animacy = defaultdict(list)
+        by_rhyme_group = defaultdict(list)
+        by_pos_rhyme_group = defaultdict(list)
+        content_categories = []
+
+        for word, tags in self._entries.items():
+            pos = tags["pos"]
+            category = tags["category"]
+            by_pos[pos].append(word)
+            by_category[category].append(word)
+            by_pos_category[(pos, category)].append(word)
+            by_animacy[tags.get("animacy", "unknown")].append(word)
+            rhyme_group = tags.get("rhyme_group", word)
+            by_rhyme_group[rhyme_group].append(word)
+            by_pos_rhyme_group[(pos, rhyme_group)].append(word)
+            if pos not in FUNCTION_POS and category not in content_categories:
+                content_categories.append(category)
+
+        self.by_pos = {key: tuple(words) for key, words in by_pos.items()}
+        self.by_category = {key: tuple(words) for key, words in by_category.items()}
+        self.by_pos_category = {key: tuple(words) for key, words in by_pos_category.items()}
+        self.by_animacy = {key: tuple(words) for key, words in by_animacy.items()}
+        self.by_rhyme_group = {key: tuple(words) for key, words in by_rhyme_group.items()}
+        self.by_pos_rhyme_group = {key: tuple(words) for key, words in by_pos_rhyme_group.items()}
+        # Number of other words sharing each word's rhyme group
+        self.rhyme_partner_counts = {
+            word: len(self.by_rhyme_group[tags.get("rhyme_group", word)]) - 1
+            for word, tags in self._entries.items()
+        }
+        self.content_categories = tuple(content_categories)
+        # Plural and third-person forms of every word, so slots don't rewrite suffixes
+        self.forms = inflect_all(self._entries)
+        self.content_pos = tuple(pos for pos in self.by_pos if pos not in FUNCTION_POS)
+        self.function_words = {pos: self.by_pos[pos] for pos in FUNCTION_POS if pos in self.by_pos}
+
+        self._category_words_cache = {}
+        self._verbs_for_animacy_cache = {}
+        self._rhyme_friendly_cache = {}
+
+    def __getitem__(self, word):
+        return self._entries[word]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, word):
+        return word in self._entries
+
+    def words(self, pos=None, category=None):
+        """Return the words matching a POS and/or category as a tuple."""
+        if pos is not None and category is not None:
+            return self.by_pos_category.get((pos, category), ())
+        if pos is not None:
+            return self.by_pos.get(pos, ())
+        if category is not None:
+            return self.by_category.get(category, ())
+        return tuple(self._entries)
+
+    def words_for_categories(self, categories):
+        """Return a POS -> words mapping of all function words plus the content words in ``categories``.
+
+        Results are cached per category combination; callers must not mutate them.
+        """
+        key = tuple(sorted(set(categories)))
+        cached = self._category_words_cache.get(key)
+        if cached is None:
+            cached = dict(self.function_words)
+            for pos in self.content_pos:
+                pos_words = []
+                for category in key:
+                    pos_words.extend(self.by_pos_category.get((pos, category), ()))
+                if pos_words:
+                    cached[pos] = tuple(pos_words)
+            self._category_words_cache[key] = cached
+        return cached
+
+    def rhymes(self, word, pos=None, exclude=None):
+        """Return the words sharing ``word``'s rhyme group, optionally restricted to a POS.
+
+        ``word`` itself and anything in ``exclude`` are left out.
+        """
+        tags = self._entries.get(word)
+        if tags is None:
+            return []
+        rhyme_group = tags.get("rhyme_group", word)
+        if pos is None:
+            group_words = self.by_rhyme_group.get(rhyme_group, ())
+        else:
+            group_words = self.by_pos_rhyme_group.get((pos, rhyme_group), ())
+        if exclude is None:
+            exclude = ()
+        return [w for w in group_words if w != word and w not in exclude]
+
+    def rhyme_friendly_words(self, pos, min_partners=2):
+        """Return the words of a POS that have at least ``min_partners`` rhyming partners."""
+        key = (pos, min_partners)
+        cached = self._rhyme_friendly_cache.get(key)
+        if cached is None:
+            cached = tuple(
+                word for word in self.words(pos=pos) if self.rhyme_partner_counts[word] >= min_partners
+            )
+            self._rhyme_friendly_cache[key] = cached
+        return cached
+
+    def verbs_for_animacy(self, animacy):
+        """Return the verbs a noun with the given animacy can perform."""
+        cached = self._verbs_for_animacy_cache.get(animacy)
+        if cached is None:
+            # Animate nouns can perform human actions and natural phenomena;
+            # inanimate, abstract and time nouns only natural phenomena
+            if animacy == "animate":
+                verb_types = ("human", "natural")
+            elif animacy in ("inanimate", "abstract", "time"):
+                verb_types = ("natural",)
+            else:
+                # Unknown animacy - allow all verbs (fallback)
+                verb_types = None
+
+            if verb_types is None:
+                cached = self.words(pos="verb")
+            else:
+                # Verb lines carry their type (human/natural) in the animacy field
+                cached = tuple(
+                    word
+                    for verb_type in verb_types
+                    for word in self.by_animacy.get(verb_type, ())
+                    if self._entries[word]["pos"] == "verb"
+                )
+            self._verbs_for_animacy_cache[animacy] = cached
+        return cached
+
+def load_word_bank(filename="words.txt", metrics=None):
+    started = perf_counter()
     word_bank = {}
     possible_paths = [
         filename,
@@ -49,7 +210,10 @@ def load_word_bank(filename="words.txt"):
                                 "category": category, 
                                 "rhyme_group": word
                             }
-                print(f"Loaded {len(word_bank)} words from {filepath}")
+                logger.info("Loaded %d words from %s", len(word_bank), filepath)
+                word_bank = WordBank(word_bank)
+                if metrics is not None:
+                    metrics.add_time("loading", perf_counter() - started)
                 return word_bank
         except FileNotFoundError:
             continue
@@ -181,29 +345,16 @@ transition_matrix = {
     }
 }
 
-def find_rhyming_words(word, candidates, forbidden_words=None):
-    """Find rhyming words from candidates using rhyme groups, excluding forbidden words."""
-    if forbidden_words is None:
-        forbidden_words = set()
-    
-    target_rhyme_group = None
-    for w, tags in word_bank.items():
-        if w == word:
-            target_rhyme_group = tags.get("rhyme_group", word)
-            break
-    
-    if target_rhyme_group is None:
-        return []
-    
-    rhyming_words = []
-    for candidate in candidates:
-        if candidate in word_bank:
-            candidate_rhyme_group = word_bank[candidate].get("rhyme_group", candidate)
-            if (candidate_rhyme_group == target_rhyme_group and 
-                candidate not in forbidden_words and 
-                candidate != word):
-                rhyming_words.append(candidate)
-    
+def find_rhyming_words(word, candidates=None, forbidden_words=None, pos=None):
+    """Find rhyming words using rhyme groups, excluding forbidden words.
+
+    Only words of ``pos`` (if given) and words in ``candidates`` (if given) are returned.
+    """
+    rhyming_words = word_bank.rhymes(word, pos=pos, exclude=forbidden_words)
+    if candidates is not None:
+        if not isinstance(candidates, (set, frozenset)):
+            candidates = set(candidates)
+        rhyming_words = [w for w in rhyming_words if w in candidates]
     return rhyming_words
 
 TOPICS = {
@@ -218,52 +369,26 @@ TOPICS = {
     "farewell": ["emotion", "time"],
 }
 
-def pick_topic():
-    return random.choice(list(TOPICS.keys()))
+def pick_topic(rng=None):
+    rng = rng or random
+    return rng.choice(list(TOPICS.keys()))
 
 def choose_article(word):
     """Return 'an' if word starts with a vowel sound, else 'a'."""
     if not word:
         return 'a'
-    
-    vowel_sound_words = {
-        'hour', 'honor', 'honest', 'heir', 'herb', 'herbal', 'historic', 'historical',
-        'hysterical', 'hysterically', 'hysterics', 'hysteric'
-    }
-    
-    consonant_u_words = {
-        'universal', 'university', 'uniform', 'union', 'unique', 'united', 'unity',
-        'universe'
-    }
-    
-    if word.lower() in vowel_sound_words:
-        return 'an'
-    
-    if word.lower() in consonant_u_words:
-        return 'a'
-    
-    if word[0].lower() in 'aeiou':
-        return 'an'
-    
-    return 'a'
+    return indefinite_article(word)
+
+def word_forms(word):
+    """Plural and third-person forms of word: precomputed for bank words, memoized otherwise."""
+    forms = word_bank.forms.get(word)
+    return forms if forms is not None else inflect(word)
 
 def pluralize(word):
-    """Very basic pluralization: add 's' or 'es'."""
-    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
-        return word + 'es'
-    elif word.endswith('y') and word[-2] not in 'aeiou':
-        return word[:-1] + 'ies'
-    else:
-        return word + 's'
+    return word_forms(word).plural
 
 def conjugate_verb_s(word):
-    """Very basic third-person singular conjugation."""
-    if word.endswith(('s', 'x', 'z', 'ch', 'sh')):
-        return word + 'es'
-    elif word.endswith('y') and word[-2] not in 'aeiou':
-        return word[:-1] + 'ies'
-    else:
-        return word + 's'
+    return word_forms(word).third_person
 
 SENTENCE_TEMPLATES = {
     "interjection_noun_verb": [
@@ -306,66 +431,95 @@ SENTENCE_TEMPLATES = {
     ]
 }
 
+# Placeholder name -> part of speech it draws from
+PLACEHOLDER_POS = {
+    "interjection": "interjection",
+    "adjective": "adjective",
+    "noun": "noun",
+    "verb": "verb",
+    "adverb": "adverb",
+    "preposition": "preposition",
+    "noun_plural": "noun",
+    "verb_s": "verb"
+}
+
+# Placeholders a line may end on when it has to rhyme
+RHYMABLE_PLACEHOLDERS = ("noun", "adjective", "verb")
+
+# kind is "literal", "article" or "word". For article slots, pos is the POS
+# of the placeholder it precedes (None if it precedes a literal).
+TemplateSlot = namedtuple("TemplateSlot", ["kind", "text", "placeholder", "pos", "trailing"])
+TemplatePlan = namedtuple("TemplatePlan", ["template", "slots", "has_article", "last_placeholder", "last_pos"])
+
+def _parse_placeholder(part):
+    """Split '{name}rest' into (name, rest), or return None for a literal token."""
+    if part.startswith('{') and '}' in part:
+        end_brace = part.index('}')
+        return part[1:end_brace], part[end_brace+1:]
+    return None
+
+@lru_cache(maxsize=None)
+def compile_template(template):
+    """Parse a template string once into an immutable TemplatePlan."""
+    parts = template.split()
+    parsed = [_parse_placeholder(part) for part in parts]
+    slots = []
+    
+    for i, part in enumerate(parts):
+        if part == '{article}':
+            next_pos = None
+            if i + 1 < len(parts) and parsed[i + 1] is not None:
+                next_placeholder = parsed[i + 1][0]
+                next_pos = PLACEHOLDER_POS.get(next_placeholder, next_placeholder)
+            slots.append(TemplateSlot("article", part, "article", next_pos, ""))
+        elif parsed[i] is not None:
+            placeholder, trailing = parsed[i]
+            pos = PLACEHOLDER_POS.get(placeholder, placeholder)
+            slots.append(TemplateSlot("word", part, placeholder, pos, trailing))
+        else:
+            slots.append(TemplateSlot("literal", part, None, None, ""))
+    
+    last_placeholder = None
+    last_pos = None
+    if slots and slots[-1].kind == "word" and not slots[-1].trailing:
+        last_placeholder = slots[-1].placeholder
+        last_pos = slots[-1].pos
+    
+    return TemplatePlan(
+        template,
+        tuple(slots),
+        any(slot.kind == "article" for slot in slots),
+        last_placeholder,
+        last_pos
+    )
+
+TEMPLATE_PLANS = {
+    template_type: tuple(compile_template(t) for t in templates)
+    for template_type, templates in SENTENCE_TEMPLATES.items()
+}
+
+# Plans whose final slot is a plain rhymable placeholder, per template type
+RHYMING_TEMPLATE_PLANS = {
+    template_type: tuple(plan for plan in plans if plan.last_placeholder in RHYMABLE_PLACEHOLDERS)
+    for template_type, plans in TEMPLATE_PLANS.items()
+}
+
 def get_appropriate_verbs_for_noun(noun):
     """Get verbs that are appropriate for a given noun based on its animacy."""
     if noun not in word_bank:
         return []
     
-    noun_tags = word_bank[noun]
-    noun_animacy = noun_tags.get("animacy", "unknown")
-    
-    appropriate_verbs = []
-    for word, tags in word_bank.items():
-        if tags["pos"] == "verb":
-            verb_type = tags.get("category", "unknown")
-            
-            # Animate nouns can perform human actions and natural phenomena
-            if noun_animacy == "animate":
-                if verb_type in ["human", "natural"]:
-                    appropriate_verbs.append(word)
-            
-            # Inanimate nouns can only perform natural phenomena
-            elif noun_animacy == "inanimate":
-                if verb_type == "natural":
-                    appropriate_verbs.append(word)
-            
-            # Abstract concepts can perform some natural phenomena (metaphorically)
-            elif noun_animacy == "abstract":
-                if verb_type == "natural":
-                    appropriate_verbs.append(word)
-            
-            # Time concepts can perform some natural phenomena (metaphorically)
-            elif noun_animacy == "time":
-                if verb_type == "natural":
-                    appropriate_verbs.append(word)
-            
-            # Unknown animacy - allow all verbs (fallback)
-            else:
-                appropriate_verbs.append(word)
-    
-    return appropriate_verbs
+    noun_animacy = word_bank[noun].get("animacy", "unknown")
+    return word_bank.verbs_for_animacy(noun_animacy)
 
-def get_template_words(template_type, topic=None, previous_word=None):
+def get_template_words(template_type, topic=None, previous_word=None, rng=None):
     """Get words for a specific template type, biased toward topic if provided."""
-    words = {}
-    function_pos = ["interjection", "preposition", "conjunction", "article"]
-    
-    # Always include all function words
-    for word, tags in word_bank.items():
-        if tags["pos"] in function_pos:
-            pos = tags["pos"]
-            if pos not in words:
-                words[pos] = []
-            words[pos].append(word)
+    rng = rng or random
+    all_categories = word_bank.content_categories
     
     # Pick two related concepts for this sentence
     if topic:
         topic_cats = TOPICS.get(topic, [])
-        # Get all available categories
-        all_categories = set()
-        for word, tags in word_bank.items():
-            if tags["pos"] not in function_pos:
-                all_categories.add(tags["category"])
         
         # Start with topic categories, then add related ones
         available_categories = list(topic_cats)
@@ -377,67 +531,39 @@ def get_template_words(template_type, topic=None, previous_word=None):
         if len(available_categories) >= 2:
             # Prefer topic-related categories
             if len(topic_cats) >= 2:
-                selected_categories = random.sample(topic_cats, min(2, len(topic_cats)))
+                selected_categories = rng.sample(topic_cats, min(2, len(topic_cats)))
             elif len(topic_cats) == 1:
                 # Pick one topic category and one related category
                 other_categories = [cat for cat in available_categories if cat not in topic_cats]
                 if other_categories:
-                    selected_categories = topic_cats + [random.choice(other_categories)]
+                    selected_categories = topic_cats + [rng.choice(other_categories)]
                 else:
                     selected_categories = topic_cats
             else:
                 # No topic categories, pick any two
-                selected_categories = random.sample(available_categories, min(2, len(available_categories)))
+                selected_categories = rng.sample(available_categories, min(2, len(available_categories)))
         else:
             selected_categories = available_categories
-        
-        # Filter words by selected categories
-        for word, tags in word_bank.items():
-            if tags["pos"] not in function_pos and tags["category"] in selected_categories:
-                pos = tags["pos"]
-                if pos not in words:
-                    words[pos] = []
-                words[pos].append(word)
     else:
         # No topic specified, pick two random categories
-        all_categories = set()
-        for word, tags in word_bank.items():
-            if tags["pos"] not in function_pos:
-                all_categories.add(tags["category"])
-        
         if len(all_categories) >= 2:
-            selected_categories = random.sample(list(all_categories), 2)
+            selected_categories = rng.sample(all_categories, 2)
         else:
             selected_categories = list(all_categories)
-        
-        for word, tags in word_bank.items():
-            if tags["pos"] not in function_pos and tags["category"] in selected_categories:
-                pos = tags["pos"]
-                if pos not in words:
-                    words[pos] = []
-                words[pos].append(word)
+    
+    words = word_bank.words_for_categories(selected_categories)
     
     # If we still don't have enough words, add some from all categories
-    if not words or all(len(word_list) == 0 for word_list in words.values() if word_list and not isinstance(word_list[0], tuple)):
-        for word, tags in word_bank.items():
-            if tags["pos"] not in function_pos:
-                pos = tags["pos"]
-                if pos not in words:
-                    words[pos] = []
-                words[pos].append(word)
+    if not words:
+        words = word_bank.words_for_categories(all_categories)
     
     return words
 
 def is_plural(word):
-    """Better plural detection: check if word ends with 's' but not 'ss' or common singular words ending in 's'."""
+    """Better plural detection: irregular plurals, or ending in 's' but not 'ss' or a common singular word ending in 's'."""
     if not word:
         return False
-    singular_s_words = {'this', 'his', 'its', 'thus', 'plus', 'minus', 'status', 'campus', 'virus', 'chorus', 'bonus', 'census', 'focus', 'genius', 'radius', 'sinus', 'terminus', 'torus', 'viscus', 'apparatus', 'corpus', 'omnibus', 'prospectus', 'rebus', 'surplus', 'torus', 'viscus', 'abacus', 'crocus', 'fungus', 'hippopotamus', 'octopus', 'platypus', 'rhinoceros', 'stadium', 'syllabus', 'terminus', 'uterus', 'villus', 'alumnus', 'bacillus', 'bronchus', 'locus', 'nucleus', 'stimulus', 'syllabus', 'thesaurus', 'umbilicus', 'uterus', 'villus', 'alumnus', 'bacillus', 'bronchus', 'locus', 'nucleus', 'stimulus', 'syllabus', 'thesaurus', 'umbilicus'}
-    
-    if word.lower() in singular_s_words:
-        return False
-    
-    return word.endswith('s') and not word.endswith('ss')
+    return word_forms(word).is_plural
     
 def conjugate_verb_for_noun(verb, noun):
     """Conjugate verb based on whether the noun is singular or plural."""
@@ -446,293 +572,212 @@ def conjugate_verb_for_noun(verb, noun):
     else:
         return conjugate_verb_s(verb)
 
-def fill_template(template, words, topic=None, force_last_word=None):
-    """Fill a template with appropriate words, handling 'a/an', 'the', pluralization, and verb conjugation."""
+def choose_slot_word(pos, topic=None, previous_word=None, last_noun=None, rng=None):
+    """Pick a word for a placeholder slot, preferring verbs that suit the subject noun."""
+    rng = rng or random
+    template_words = get_template_words("any", topic, previous_word, rng)
+    
+    # If this is a verb and we have a subject noun, use appropriate verbs
+    if pos == "verb" and last_noun is not None:
+        appropriate_verbs = get_appropriate_verbs_for_noun(last_noun)
+        if appropriate_verbs:
+            # Filter to topic-appropriate verbs if possible
+            if topic and template_words.get("verb"):
+                topic_verbs = set(template_words["verb"])
+                appropriate_topic_verbs = [v for v in appropriate_verbs if v in topic_verbs]
+                if appropriate_topic_verbs:
+                    return rng.choice(appropriate_topic_verbs)
+            return rng.choice(appropriate_verbs)
+    
+    if pos in template_words and template_words[pos]:
+        return rng.choice(template_words[pos])
+    fallback_words = word_bank.words(pos=pos)
+    return rng.choice(fallback_words) if fallback_words else "word"
+
+def fill_template(template, words, topic=None, force_last_word=None, rng=None):
+    """Fill a template with appropriate words, handling 'a/an', 'the', pluralization, and verb conjugation.
+
+    ``template`` may be a template string or a compiled TemplatePlan.
+    """
+    rng = rng or random
     try:
+        plan = template if isinstance(template, TemplatePlan) else compile_template(template)
+        slots = plan.slots
+        last_index = len(slots) - 1
         filled_parts = []
-        i = 0
-        parts = template.split()
         last_noun = None
+        last_noun_is_plural = False
         previous_word = None
+        pending_article = None
         
-        while i < len(parts):
-            part = parts[i]
+        for i, slot in enumerate(slots):
+            kind = slot.kind
             
-            if part == '{article}':
-                next_word = None
-                if i + 1 < len(parts):
-                    next_part = parts[i + 1]
-                    if next_part.startswith('{') and '}' in next_part:
-                        end_brace = next_part.index('}')
-                        placeholder = next_part[1:end_brace]
-                        pos_mapping = {
-                            "interjection": "interjection",
-                            "adjective": "adjective", 
-                            "noun": "noun",
-                            "verb": "verb",
-                            "adverb": "adverb",
-                            "preposition": "preposition",
-                            "noun_plural": "noun",
-                            "verb_s": "verb"
-                        }
-                        pos = pos_mapping.get(placeholder, placeholder)
-                        
-                        template_words = get_template_words("any", topic, previous_word)
-                        
-                        if pos in template_words and template_words[pos]:
-                            next_word = random.choice(template_words[pos])
-                        else:
-                            fallback_words = [w for w, t in word_bank.items() if t["pos"] == pos]
-                            next_word = random.choice(fallback_words) if fallback_words else "word"
-                
-                if next_word:
-                    article = choose_article(next_word)
-                else:
-                    article = "the"
-                
-                filled_parts.append(article)
-                i += 1
+            if kind == "literal":
+                filled_parts.append(slot.text)
                 continue
             
-            if part.startswith('{') and '}' in part:
-                end_brace = part.index('}')
-                placeholder = part[1:end_brace]
-                trailing = part[end_brace+1:]
-                pos_mapping = {
-                    "interjection": "interjection",
-                    "adjective": "adjective", 
-                    "noun": "noun",
-                    "verb": "verb",
-                    "adverb": "adverb",
-                    "preposition": "preposition",
-                    "noun_plural": "noun",
-                    "verb_s": "verb"
-                }
-                pos = pos_mapping.get(placeholder, placeholder)
-                
-                if force_last_word and i == len(parts) - 1:
-                    word = force_last_word
-                else:
-                    template_words = get_template_words("any", topic, previous_word)
-                    
-                    # If this is a verb and we have a subject noun, use appropriate verbs
-                    if pos == "verb" and last_noun is not None:
-                        appropriate_verbs = get_appropriate_verbs_for_noun(last_noun)
-                        if appropriate_verbs:
-                            # Filter to topic-appropriate verbs if possible
-                            if topic and template_words.get("verb"):
-                                topic_verbs = set(template_words["verb"])
-                                appropriate_topic_verbs = [v for v in appropriate_verbs if v in topic_verbs]
-                                if appropriate_topic_verbs:
-                                    word = random.choice(appropriate_topic_verbs)
-                                else:
-                                    word = random.choice(appropriate_verbs)
-                            else:
-                                word = random.choice(appropriate_verbs)
-                        else:
-                            # Fallback to any verb if no appropriate ones found
-                            if pos in template_words and template_words[pos]:
-                                word = random.choice(template_words[pos])
-                            else:
-                                fallback_words = [w for w, t in word_bank.items() if t["pos"] == pos]
-                                word = random.choice(fallback_words) if fallback_words else "word"
-                    else:
-                        # Normal word selection for non-verbs or when no subject noun
-                        if pos in template_words and template_words[pos]:
-                            word = random.choice(template_words[pos])
-                        else:
-                            fallback_words = [w for w, t in word_bank.items() if t["pos"] == pos]
-                            word = random.choice(fallback_words) if fallback_words else "word"
-                
-                if placeholder == "noun_plural":
-                    word = pluralize(word)
-                elif pos == "noun":
-                    pass
-                
-                if placeholder == "verb_s":
-                    word = conjugate_verb_s(word)
-                elif pos == "verb" and last_noun is not None:
-                    word = conjugate_verb_for_noun(word, last_noun)
-                
-                if pos == "noun":
-                    last_noun = word
-                
-                filled_parts.append(word + trailing)
-                previous_word = word
+            if kind == "article":
+                # Resolved once the word it precedes has been chosen, so 'a'/'an'
+                # agrees with that word rather than with a separate look-ahead draw
+                pending_article = len(filled_parts) if slot.pos is not None else None
+                filled_parts.append("the")
+                continue
             
-            elif part == '{verb}':
-                pos = 'verb'
-                if force_last_word and i == len(parts) - 1:
-                    word = force_last_word
-                else:
-                    template_words = get_template_words("any", topic, previous_word)
-                    
-                    # If we have a subject noun, use appropriate verbs
-                    if last_noun is not None:
-                        appropriate_verbs = get_appropriate_verbs_for_noun(last_noun)
-                        if appropriate_verbs:
-                            # Filter to topic-appropriate verbs if possible
-                            if topic and template_words.get("verb"):
-                                topic_verbs = set(template_words["verb"])
-                                appropriate_topic_verbs = [v for v in appropriate_verbs if v in topic_verbs]
-                                if appropriate_topic_verbs:
-                                    word = random.choice(appropriate_topic_verbs)
-                                else:
-                                    word = random.choice(appropriate_verbs)
-                            else:
-                                word = random.choice(appropriate_verbs)
-                        else:
-                            # Fallback to any verb if no appropriate ones found
-                            if pos in template_words and template_words[pos]:
-                                word = random.choice(template_words[pos])
-                            else:
-                                fallback_words = [w for w, t in word_bank.items() if t["pos"] == pos]
-                                word = random.choice(fallback_words) if fallback_words else "word"
-                    else:
-                        # Normal word selection when no subject noun
-                        if pos in template_words and template_words[pos]:
-                            word = random.choice(template_words[pos])
-                        else:
-                            fallback_words = [w for w, t in word_bank.items() if t["pos"] == pos]
-                            word = random.choice(fallback_words) if fallback_words else "word"
-                
-                if last_noun is not None:
-                    word = conjugate_verb_for_noun(word, last_noun)
-                
-                filled_parts.append(word)
-                previous_word = word
+            pos = slot.pos
+            placeholder = slot.placeholder
+            
+            if force_last_word and i == last_index:
+                word = force_last_word
             else:
-                filled_parts.append(part)
+                word = choose_slot_word(pos, topic, previous_word, last_noun, rng)
+            
+            if pending_article is not None:
+                filled_parts[pending_article] = choose_article(word)
+                pending_article = None
+            
+            forms = word_forms(word)
+            if placeholder == "noun_plural":
+                word = forms.plural
             
-            i += 1
+            if placeholder == "verb_s":
+                word = forms.third_person
+            elif pos == "verb" and last_noun is not None and not last_noun_is_plural:
+                word = forms.third_person
+            
+            if pos == "noun":
+                last_noun = word
+                last_noun_is_plural = placeholder == "noun_plural" or forms.is_plural
+            
+            filled_parts.append(word + slot.trailing)
+            previous_word = word
         
         result = " ".join(filled_parts)
         return result
     except Exception as e:
         return f"Error filling template: {e}"
 
-def generate_template_line(template_type, topic=None, enforce_rhyme_with=None, forbidden_words=None):
+def _fill_plan(plan, template_type, topic, metrics, force_last_word=None, rng=None):
+    """Pick the template's words and fill ``plan``, timing both stages."""
+    rng = rng or random
+    with metrics.stage("template_selection"):
+        words = get_template_words(template_type, topic, rng=rng)
+    with metrics.stage("slot_filling"):
+        return fill_template(plan, words, topic, force_last_word=force_last_word, rng=rng)
+
+def generate_template_line(template_type, topic=None, enforce_rhyme_with=None, forbidden_words=None, metrics=None, rng=None):
     """Generate a line using templates. If enforcing a rhyme, pick the rhyme word first and build the sentence around it."""
-    templates = SENTENCE_TEMPLATES.get(template_type, SENTENCE_TEMPLATES["adjective_noun_verb"])
+    rng = rng or random
+    if metrics is None:
+        metrics = Metrics()
+    plans = TEMPLATE_PLANS.get(template_type, TEMPLATE_PLANS["adjective_noun_verb"])
     
     if not enforce_rhyme_with:
-        template = random.choice(templates)
-        words = get_template_words(template_type, topic)
-        return fill_template(template, words, topic)
+        plan = rng.choice(plans)
+        return _fill_plan(plan, template_type, topic, metrics, rng=rng)
     
-    rhyming_templates = []
-    rhymable_types = ["noun", "adjective", "verb"]
-    for t in templates:
-        parts = t.split()
-        if parts and parts[-1].startswith('{') and parts[-1].endswith('}'):
-            placeholder = parts[-1][1:-1]
-            if placeholder in rhymable_types:
-                rhyming_templates.append((t, placeholder))
-    
-    if not rhyming_templates:
-        rhyming_templates = [(random.choice(templates), None)]
+    rhyming_plans = RHYMING_TEMPLATE_PLANS.get(template_type, RHYMING_TEMPLATE_PLANS["adjective_noun_verb"])
+    if not rhyming_plans:
+        rhyming_plans = (rng.choice(plans),)
     
     max_attempts = 20
     attempt = 0
     best_line = None
     
     while attempt < max_attempts:
-        template, placeholder = random.choice(rhyming_templates)
+        metrics.incr("rhyme_attempts")
+        plan = rng.choice(rhyming_plans)
         
-        if placeholder:
-            pos = placeholder
-            candidates = [w for w, t in word_bank.items() if t["pos"] == pos]
-            rhyming_candidates = find_rhyming_words(enforce_rhyme_with, candidates, forbidden_words)
+        if plan.last_placeholder in RHYMABLE_PLACEHOLDERS:
+            with metrics.stage("rhyme_search"):
+                rhyming_candidates = find_rhyming_words(enforce_rhyme_with, forbidden_words=forbidden_words, pos=plan.last_pos)
+            metrics.observe("rhyme_candidates", len(rhyming_candidates))
             
             if rhyming_candidates:
-                chosen_rhyme = random.choice(rhyming_candidates)
-                words = get_template_words(template_type, topic)
-                line = fill_template(template, words, topic, force_last_word=chosen_rhyme)
+                chosen_rhyme = rng.choice(rhyming_candidates)
+                line = _fill_plan(plan, template_type, topic, metrics, force_last_word=chosen_rhyme, rng=rng)
                 
                 if line and line.split()[-1] == chosen_rhyme:
-                    print(f"[RHYME SUCCESS] Attempt {attempt+1}: '{enforce_rhyme_with}' rhymed with '{chosen_rhyme}' (built-in)")
+                    logger.debug("[RHYME SUCCESS] Attempt %d: '%s' rhymed with '%s' (built-in)", attempt + 1, enforce_rhyme_with, chosen_rhyme)
+                    metrics.incr("rhyme_successes")
                     return line
         
         if attempt >= 10:
-            all_words = list(word_bank.keys())
-            rhyming_candidates = find_rhyming_words(enforce_rhyme_with, all_words, forbidden_words)
+            with metrics.stage("rhyme_search"):
+                rhyming_candidates = find_rhyming_words(enforce_rhyme_with, forbidden_words=forbidden_words)
             
             if rhyming_candidates:
-                chosen_rhyme = random.choice(rhyming_candidates)
+                chosen_rhyme = rng.choice(rhyming_candidates)
                 word_pos = word_bank[chosen_rhyme]["pos"]
-                for t in templates:
-                    parts = t.split()
-                    if parts and parts[-1].startswith('{') and parts[-1].endswith('}'):
-                        placeholder = parts[-1][1:-1]
-                        if placeholder == word_pos or placeholder in ["noun", "adjective", "verb"]:
-                            words = get_template_words(template_type, topic)
-                            line = fill_template(t, words, topic, force_last_word=chosen_rhyme)
-                            if line and line.split()[-1] == chosen_rhyme:
-                                print(f"[RHYME SUCCESS] Attempt {attempt+1}: '{enforce_rhyme_with}' rhymed with '{chosen_rhyme}' (any type)")
-                                return line
+                for candidate_plan in plans:
+                    placeholder = candidate_plan.last_placeholder
+                    if placeholder is not None and (placeholder == word_pos or placeholder in RHYMABLE_PLACEHOLDERS):
+                        line = _fill_plan(candidate_plan, template_type, topic, metrics, force_last_word=chosen_rhyme, rng=rng)
+                        if line and line.split()[-1] == chosen_rhyme:
+                            logger.debug("[RHYME SUCCESS] Attempt %d: '%s' rhymed with '%s' (any type)", attempt + 1, enforce_rhyme_with, chosen_rhyme)
+                            metrics.incr("rhyme_successes")
+                            metrics.incr("rhyme_any_pos_fallbacks")
+                            return line
         
-        words = get_template_words(template_type, topic)
-        line = fill_template(template, words, topic)
+        line = _fill_plan(plan, template_type, topic, metrics, rng=rng)
 
         if best_line is None:
             best_line = line
         
         attempt += 1
     
-    print(f"[RHYME FAIL] Could not rhyme with '{enforce_rhyme_with}' after {max_attempts} attempts. Using best effort.")
+    logger.debug("[RHYME FAIL] Could not rhyme with '%s' after %d attempts. Using best effort.", enforce_rhyme_with, max_attempts)
+    metrics.incr("rhyme_failures")
     return best_line
 
-def generate_rhyme_friendly_line(template_type, topic=None):
+def generate_rhyme_friendly_line(template_type, topic=None, metrics=None, rng=None):
     """Generate a line that ends with a word that has rhyming partners."""
-    templates = SENTENCE_TEMPLATES.get(template_type, SENTENCE_TEMPLATES["adjective_noun_verb"])
-    
-    rhyming_templates = []
-    rhymable_types = ["noun", "adjective", "verb"]
-    for t in templates:
-        parts = t.split()
-        if parts and parts[-1].startswith('{') and parts[-1].endswith('}'):
-            placeholder = parts[-1][1:-1]
-            if placeholder in rhymable_types:
-                rhyming_templates.append((t, placeholder))
+    rng = rng or random
+    if metrics is None:
+        metrics = Metrics()
+    plans = TEMPLATE_PLANS.get(template_type, TEMPLATE_PLANS["adjective_noun_verb"])
     
-    if not rhyming_templates:
-        rhyming_templates = [(random.choice(templates), None)]
+    rhyming_plans = RHYMING_TEMPLATE_PLANS.get(template_type, RHYMING_TEMPLATE_PLANS["adjective_noun_verb"])
+    if not rhyming_plans:
+        rhyming_plans = (rng.choice(plans),)
     
     max_attempts = 10
     for attempt in range(max_attempts):
-        template, placeholder = random.choice(rhyming_templates)
+        plan = rng.choice(rhyming_plans)
         
-        if placeholder:
-            pos = placeholder
-            candidates = [w for w, t in word_bank.items() if t["pos"] == pos]
-            
-            rhyme_friendly_words = []
-            for word in candidates:
-                rhyming_partners = find_rhyming_words(word, list(word_bank.keys()))
-                if len(rhyming_partners) >= 2:
-                    rhyme_friendly_words.append(word)
+        if plan.last_placeholder in RHYMABLE_PLACEHOLDERS:
+            with metrics.stage("rhyme_search"):
+                rhyme_friendly_words = word_bank.rhyme_friendly_words(plan.last_pos)
             
             if rhyme_friendly_words:
-                chosen_word = random.choice(rhyme_friendly_words)
-                words = get_template_words(template_type, topic)
-                line = fill_template(template, words, topic, force_last_word=chosen_word)
+                chosen_word = rng.choice(rhyme_friendly_words)
+                line = _fill_plan(plan, template_type, topic, metrics, force_last_word=chosen_word, rng=rng)
                 if line and line.split()[-1] == chosen_word:
                     return line
         
-        words = get_template_words(template_type, topic)
-        line = fill_template(template, words, topic)
+        line = _fill_plan(plan, template_type, topic, metrics, rng=rng)
         if line:
+            metrics.incr("rhyme_friendly_fallbacks")
             return line
     
-    template = random.choice(templates)
-    words = get_template_words(template_type, topic)
-    return fill_template(template, words, topic)
+    plan = rng.choice(plans)
+    return _fill_plan(plan, template_type, topic, metrics, rng=rng)
 
-def generate_poem(num_stanzas=3, lines_per_stanza=4, topic=None):
+def generate_poem(num_stanzas=3, lines_per_stanza=4, topic=None, metrics=None, rng=None):
+    """Generate a poem as a list of stanzas; rhyme counters are added to metrics, if given.
+
+    Every choice is drawn from ``rng`` (e.g. ``random.Random(seed)``), or from
+    the global generator when it is omitted.
+    """
+    rng = rng or random
+    if metrics is None:
+        metrics = Metrics()
+    metrics.incr("poems")
+    started = perf_counter()
     poem = []
     
     if topic is None:
-        topic = pick_topic()
+        topic = pick_topic(rng)
     
     template_types = list(SENTENCE_TEMPLATES.keys())
     
@@ -745,7 +790,7 @@ def generate_poem(num_stanzas=3, lines_per_stanza=4, topic=None):
         for line_idx in range(lines_per_stanza):
             if line_idx == 0:
                 template_type = "interjection_noun_verb"
-                line = generate_rhyme_friendly_line(template_type, topic)
+                line = generate_rhyme_friendly_line(template_type, topic, metrics, rng)
                 stanza_lines.append(line)
                 if line:
                     last_word = line.split()[-1]
@@ -753,22 +798,22 @@ def generate_poem(num_stanzas=3, lines_per_stanza=4, topic=None):
                     forbidden_words.add(last_word)
             elif line_idx == 1:
                 template_type = "adjective_noun_verb"
-                line = generate_rhyme_friendly_line(template_type, topic)
+                line = generate_rhyme_friendly_line(template_type, topic, metrics, rng)
                 stanza_lines.append(line)
                 if line:
                     last_word = line.split()[-1]
                     rhyme_B = last_word
                     forbidden_words.add(last_word)
             elif line_idx == 2:
-                template_type = random.choice(template_types)
-                line = generate_template_line(template_type, topic, enforce_rhyme_with=rhyme_A, forbidden_words=forbidden_words)
+                template_type = rng.choice(template_types)
+                line = generate_template_line(template_type, topic, enforce_rhyme_with=rhyme_A, forbidden_words=forbidden_words, metrics=metrics, rng=rng)
                 stanza_lines.append(line)
                 if line:
                     last_word = line.split()[-1]
                     forbidden_words.add(last_word)
             elif line_idx == 3:
-                template_type = random.choice(template_types)
-                line = generate_template_line(template_type, topic, enforce_rhyme_with=rhyme_B, forbidden_words=forbidden_words)
+                template_type = rng.choice(template_types)
+                line = generate_template_line(template_type, topic, enforce_rhyme_with=rhyme_B, forbidden_words=forbidden_words, metrics=metrics, rng=rng)
                 stanza_lines.append(line)
                 if line:
                     last_word = line.split()[-1]
@@ -778,20 +823,37 @@ def generate_poem(num_stanzas=3, lines_per_stanza=4, topic=None):
         if stanza < num_stanzas - 1:
             poem.append([])
     
-    print(f"[Poem Topic: {topic.capitalize()}]")
+    metrics.add_time("poem", perf_counter() - started)
+    logger.info("[Poem Topic: %s]", topic.capitalize())
     return poem
 
-def print_poem(poem):
+def format_poem(poem):
+    """Return generate_poem's stanzas as text: capitalised lines, one blank line between stanzas."""
+    blocks = []
     for stanza in poem:
         if isinstance(stanza, list):
-            for line in stanza:
-                if line:
-                    print(line.capitalize())
-            print()
+            # Empty lists only separate the stanzas
+            if stanza:
+                blocks.append("\n".join(line.capitalize() for line in stanza if line))
         else:
-            print(stanza)
+            blocks.append(stanza)
+    return "\n\n".join(blocks)
+
+def print_poem(poem):
+    print(format_poem(poem))
+    print()
 
 if __name__ == "__main__":
-    poem = generate_poem(num_stanzas=3, lines_per_stanza=4)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a rhyming poem from words.txt")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible output")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # The word bank was loaded at import, before logging was configured
+    logger.info("Loaded %d words", len(word_bank))
+    # Without a seed, draw from the global generator
+    rng = random.Random(args.seed) if args.seed is not None else None
+    poem = generate_poem(num_stanzas=3, lines_per_stanza=4, rng=rng)
     print_poem(poem)
 
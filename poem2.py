@@ -1,10 +1,22 @@
+import logging
+import os
 import random
+from collections import defaultdict, deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from time import perf_counter
+from types import MappingProxyType
 
-# Track used words to avoid repetition
-used_words = set()
+from lexicon import indefinite_article, inflect, inflect_all, prepositions_for
+from metrics import Metrics
+
+# Per-sentence and per-word traces; silent unless logging is configured
+logger = logging.getLogger(__name__)
 
 # Load words and tags
-def load_words(filename):
+def load_words(filename, corpus_paths=None, metrics=None):
+    started = perf_counter()
     words = []
     with open(filename) as f:
         for line in f:
@@ -32,22 +44,182 @@ def load_words(filename):
                     'pos_anim': anim  # Use existing anim tag as fallback
                 })
     
-    print(f"Loaded {len(words)} words from {filename}")
-    return words
+    logger.info("Loaded %d words from %s", len(words), filename)
+    if corpus_paths:
+        word_list = with_transition_model(words, corpus_paths, metrics)
+    else:
+        word_list = WordList(words)
+    if metrics is not None:
+        metrics.add_time('loading', perf_counter() - started)
+    return word_list
+
+# Corpora the CLI learns word transitions from
+DEFAULT_CORPORA = ("frost_poems.txt", "stray_birds.txt")
+
+def with_transition_model(words, corpus_paths=DEFAULT_CORPORA, metrics=None):
+    """Return words as a WordList weighted by a TransitionModel learned from corpus_paths.
+
+    The model needs NumPy; without it the hand-written transition table is used.
+    """
+    try:
+        from pos_model import TransitionModel
+    except ImportError:
+        logger.warning("NumPy is not installed; using the built-in transition table")
+        return words if isinstance(words, WordList) else WordList(words)
+    started = perf_counter()
+    model = TransitionModel.train(words, corpus_paths)
+    if metrics is not None:
+        metrics.add_time('model_training', perf_counter() - started)
+    return WordList(words, model)
+
+def _word_animacy(word):
+    return word.get('pos_anim', word.get('anim', 'inanimate'))
+
+def _animacy_matches(pos, word_anim, sentence_animacy):
+    """Whether a word of this POS and animacy can appear in a sentence of sentence_animacy"""
+    # Subjects (nouns) must match the sentence; verbs may also be tagged 'both'
+    if pos == 'NOUN':
+        return word_anim == sentence_animacy
+    if pos == 'VERB':
+        return word_anim in (sentence_animacy, 'both')
+    return True
+
+class WordList(Sequence):
+    """Read-only list of word records with candidate pools built once at load time.
+
+    Indexes and iterates like the plain list load_words used to return, but
+    slot filling should ask candidates() instead of scanning every record.
+    Records are grouped into pools keyed by (main_category, pos, pos_anim,
+    category); a query resolves to a set of pool keys once and the result is
+    cached, so repeated slots are a dictionary hit.
+    
+    With a pos_model.TransitionModel, candidates are weighted by the learned
+    probability of their (pos, category) following the previous word's and
+    of the word given its state; otherwise by get_transition_probability.
+    """
+    
+    def __init__(self, records, model=None):
+        self._records = tuple(MappingProxyType(dict(r)) for r in records)
+        self.model = model
+        self._keys = [(w['main_category'], w['pos'], _word_animacy(w), w['category']) for w in self._records]
+        
+        pools = defaultdict(list)
+        for key, word in zip(self._keys, self._records):
+            pools[key].append(word)
+        self.pools = {key: tuple(words) for key, words in pools.items()}
+        self.main_categories = tuple(sorted({key[0] for key in self.pools}))
+        # Plural and third-person forms of every word, computed once
+        self.forms = inflect_all(w['word'] for w in self._records)
+        self._cache = {}
+    
+    def __getitem__(self, index):
+        return self._records[index]
+    
+    def __len__(self):
+        return len(self._records)
+    
+    def _gather(self, keys):
+        # Concatenate the pools for keys, keeping the records in file order
+        return tuple(word for key, word in zip(self._keys, self._records) if key in keys)
+    
+    def pool(self, main_categories, pos=None, sentence_animacy=None, category=None):
+        """Words in main_categories or 'neutral' that match pos, category and sentence animacy"""
+        cache_key = ('pool', tuple(sorted(set(main_categories))), pos, sentence_animacy, category)
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            allowed = set(main_categories) | {'neutral'}
+            keys = {
+                key for key in self.pools
+                if key[0] in allowed
+                and (pos is None or key[1] == pos)
+                and (category is None or key[3] == category)
+                and (sentence_animacy is None or _animacy_matches(key[1], key[2], sentence_animacy))
+            }
+            cached = self._cache[cache_key] = self._gather(keys)
+        return cached
+    
+    def candidates(self, main_categories, pos, sentence_animacy=None, strict=False):
+        """Candidates for a slot after the fallback chain: the poem's categories, then any
+        word with the sentence animacy (nouns and verbs), then, unless strict, any word
+        with this POS"""
+        cache_key = ('candidates', tuple(sorted(set(main_categories))), pos, sentence_animacy, strict)
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            cached = self.pool(main_categories, pos, sentence_animacy)
+            if not cached and sentence_animacy and pos in ['NOUN', 'VERB']:
+                cached = self._gather({key for key in self.pools if key[1] == pos and key[2] == sentence_animacy})
+            if not cached and not strict:
+                cached = self._gather({key for key in self.pools if key[1] == pos})
+            self._cache[cache_key] = cached
+        return cached
+    
+    def weighted_candidates(self, main_categories, pos, sentence_animacy=None, prev_word=None, strict=False):
+        """candidates() with cumulative weights for following prev_word.
+        
+        The weights are a tuple for random.choices, or a NumPy array when a
+        TransitionModel is loaded.
+        """
+        if self.model is not None:
+            prev_key = self.model.state_of(prev_word)
+        else:
+            prev_key = prev_word.get('pos') if prev_word else None
+        cache_key = ('weighted', tuple(sorted(set(main_categories))), pos, sentence_animacy, prev_key, strict)
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            candidates = self.candidates(main_categories, pos, sentence_animacy, strict)
+            if self.model is not None:
+                chosen = {id(w) for w in candidates}
+                record_ids = [i for i, w in enumerate(self._records) if id(w) in chosen]
+                cum_weights = self.model.cumulative_weights(prev_key, record_ids)
+            elif prev_key is None:
+                cum_weights = tuple(accumulate(1.0 for _ in candidates))
+            else:
+                cum_weights = tuple(accumulate(get_transition_probability(prev_key, w['pos']) for w in candidates))
+            cached = self._cache[cache_key] = (candidates, cum_weights)
+        return cached
+
+# Per-poem generation state
+class PoemSession:
+    """Everything one poem changes while it is generated.
+
+    The session holds the poem's random generator (the global random
+    module unless one is given), the words it has used so far (to avoid
+    repetition), its main categories and the Metrics its events are counted
+    into. Word records from load_words are read-only and shared, so any
+    number of sessions can run at once (threads, asyncio tasks) over a
+    single loaded word list, each with its own random.Random.
+    
+    words must be the WordList load_words returns: indexing a plain list
+    costs a pass over every record, too much to repeat for each session.
+    """
+    
+    def __init__(self, words, rng=None, metrics=None):
+        if not isinstance(words, WordList):
+            raise TypeError(f"words must be a WordList (pass the one load_words returns), not {type(words).__name__}")
+        self.words = words
+        self.rng = rng or random
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.used_words = set()
+        self.main_categories = None
 
 # Pick categories for the poem
-def pick_categories(words):
-    categories = list(set(w['main_category'] for w in words))
-    return random.sample(categories, 2)
+def pick_categories(words, rng=None):
+    if isinstance(words, WordList):
+        categories = list(words.main_categories)
+    else:
+        categories = sorted(set(w['main_category'] for w in words))
+    return (rng or random).sample(categories, min(2, len(categories)))
 
 # Filter words by category and part of speech
 def filter_words(words, main_categories, pos=None, category=None):
+    if isinstance(words, WordList):
+        return list(words.pool(main_categories, pos, category=category))
     filtered = [w for w in words if (w['main_category'] in main_categories or w['main_category'] == 'neutral') and (pos is None or w['pos'] == pos) and (category is None or w['category'] == category)]
     return filtered
 
 # Check animate/inanimate compatibility
-def check_animacy_compatibility(subject_word, verb_word):
-    """Check if a subject and verb are compatible in terms of animacy"""
+def check_animacy_compatibility(subject_word, verb_word, metrics=None):
+    """Check if a subject and verb are compatible in terms of animacy; rejections are counted into metrics"""
     if not subject_word or not verb_word:
         return True  # Allow if we can't determine
     
@@ -57,18 +229,22 @@ def check_animacy_compatibility(subject_word, verb_word):
     
     # If verb is animate-specific, subject should be animate
     if verb_anim == 'animate' and subject_anim == 'inanimate':
-        print(f"  REJECTED: '{subject_word['word']}' ({subject_anim}) cannot '{verb_word['word']}' ({verb_anim})")
+        logger.debug("REJECTED: '%s' (%s) cannot '%s' (%s)", subject_word['word'], subject_anim, verb_word['word'], verb_anim)
+        if metrics is not None:
+            metrics.incr('animacy_rejections')
         return False
     
     # If verb is inanimate-specific, subject should be inanimate  
     if verb_anim == 'inanimate' and subject_anim == 'animate':
-        print(f"  REJECTED: '{subject_word['word']}' ({subject_anim}) cannot '{verb_word['word']}' ({verb_anim})")
+        logger.debug("REJECTED: '%s' (%s) cannot '%s' (%s)", subject_word['word'], subject_anim, verb_word['word'], verb_anim)
+        if metrics is not None:
+            metrics.incr('animacy_rejections')
         return False
     
-    print(f"  ACCEPTED: '{subject_word['word']}' ({subject_anim}) can '{verb_word['word']}' ({verb_anim})")
+    logger.debug("ACCEPTED: '%s' (%s) can '%s' (%s)", subject_word['word'], subject_anim, verb_word['word'], verb_anim)
     return True
 
-# Enhanced transition matrix for POS
+# Enhanced transition matrix for POS (used when no TransitionModel is loaded)
 tm = {
     'NOUN': ['VERB', 'NOUN', 'ADJECTIVE', 'PREPOSITION'],
     'VERB': ['NOUN', 'ADVERB', 'PREPOSITION'],
@@ -91,60 +267,64 @@ def get_transition_probability(prev_pos, current_pos):
     else:
         return 0.2  # Lower probability for invalid transitions
 
-def select_word_with_transition(words, main_categories, pos, prev_word=None, template=None, current_index=None, selected_words=None, sentence_animacy=None):
-    """Select a word considering the transition from the previous word and sentence animacy"""
-    # Use animacy-aware filtering if sentence_animacy is provided
-    if sentence_animacy:
-        candidates = filter_words_by_animacy(words, main_categories, pos, sentence_animacy)
-    else:
-        candidates = filter_words(words, main_categories, pos=pos)
+# Redraws before _sample_unused stops rejecting used words and filters instead
+MAX_REDRAWS = 8
+# Candidates a TransitionModel maps from uniforms in one vectorized call
+SAMPLE_BATCH = 4
+
+def _draws(candidates, cum_weights, rng, model=None):
+    """Yield up to MAX_REDRAWS weighted draws from candidates"""
+    if model is None:
+        for _ in range(MAX_REDRAWS):
+            yield rng.choices(candidates, cum_weights=cum_weights)[0]
+        return
+    # Most slots accept the first draw, so batches stay small
+    for _ in range(0, MAX_REDRAWS, SAMPLE_BATCH):
+        for i in model.sample(cum_weights, [rng.random() for _ in range(SAMPLE_BATCH)]):
+            yield candidates[i]
+
+def _sample_unused(candidates, cum_weights, used_words, rng, model=None, metrics=None):
+    """Draw a weighted candidate, skipping words in used_words unless every candidate is used"""
+    # Rejection keeps the draw O(1) in memory; used words are few next to a pool
+    for redraws, word in enumerate(_draws(candidates, cum_weights, rng, model)):
+        if word['word'] not in used_words:
+            if redraws and metrics is not None:
+                metrics.incr('used_word_redraws', redraws)
+            return word
+    
+    if metrics is not None:
+        metrics.incr('used_word_redraws', MAX_REDRAWS)
+        metrics.incr('used_word_fallbacks')
+    unused = [i for i, w in enumerate(candidates) if w['word'] not in used_words]
+    if not unused:
+        return rng.choices(candidates, cum_weights=cum_weights)[0]
+    weights = [cum_weights[i] - (cum_weights[i - 1] if i else 0.0) for i in unused]
+    return candidates[rng.choices(unused, weights=weights)[0]]
+
+def select_word_with_transition(words, main_categories, pos, prev_word=None, template=None, current_index=None, selected_words=None, sentence_animacy=None, session=None, strict=False):
+    """Select a word considering the transition from the previous word and sentence animacy.
     
-    # If no candidates in main categories, expand to neutral
-    if not candidates:
-        if sentence_animacy:
-            candidates = filter_words_by_animacy(words, ['neutral'], pos, sentence_animacy)
-        else:
-            candidates = [w for w in words if w['pos'] == pos and (w['main_category'] == 'neutral' or w['main_category'] in main_categories)]
+    With strict, '' is returned instead of falling back to any word with this POS.
+    """
+    if session is None:
+        session = PoemSession(words)
+    used_words = session.used_words
     
-    # If still no candidates, use any word with this POS (but maintain animacy if possible)
-    if not candidates:
-        if sentence_animacy and pos in ['NOUN', 'VERB']:
-            # Try to find any word with matching animacy
-            candidates = [w for w in words if w['pos'] == pos and w.get('pos_anim', w.get('anim', 'inanimate')) == sentence_animacy]
-        
-        if not candidates:
-            candidates = [w for w in words if w['pos'] == pos]
+    # Precomputed pool for the poem's categories and the sentence animacy,
+    # falling back to any word with the animacy, then any word with this POS,
+    # weighted by the transition from the previous word
+    candidates, cum_weights = session.words.weighted_candidates(main_categories, pos, sentence_animacy, prev_word, strict)
     
     if not candidates:
+        # The caller re-fills a strict slot, so only count slots left empty
+        if not strict:
+            session.metrics.incr('empty_slots')
         return ''
+    session.metrics.observe('candidate_pool_size', len(candidates))
+    if candidates is not session.words.pool(main_categories, pos, sentence_animacy):
+        session.metrics.incr('candidate_fallbacks')
     
-    # Apply transition probabilities if we have a previous word
-    if prev_word and prev_word.get('pos'):
-        prev_pos = prev_word['pos']
-        weighted_candidates = []
-        
-        for candidate in candidates:
-            prob = get_transition_probability(prev_pos, pos)
-            # Add candidate multiple times based on probability
-            weight = int(prob * 10)  # Convert probability to weight
-            weighted_candidates.extend([candidate] * weight)
-        
-        if weighted_candidates:
-            candidates = weighted_candidates
-    
-    # Filter out recently used words
-    unused_candidates = [w for w in candidates if w['word'] not in used_words]
-    if unused_candidates:
-        candidates = unused_candidates
-    
-    if not candidates:
-        used_words.clear()
-        if sentence_animacy:
-            candidates = filter_words_by_animacy(words, main_categories, pos, sentence_animacy)
-        else:
-            candidates = [w for w in words if w['pos'] == pos]
-    
-    selected_word = random.choice(candidates)
+    selected_word = _sample_unused(candidates, cum_weights, used_words, session.rng, session.words.model, session.metrics)
     used_words.add(selected_word['word'])
     
     # Handle verb conjugation
@@ -154,7 +334,12 @@ def select_word_with_transition(words, main_categories, pos, prev_word=None, tem
             if template[i] == 'NOUN':
                 subject_is_plural = False
                 break
-        selected_word['word'] = conjugate_verb(selected_word['word'], subject_is_plural)
+        word = selected_word['word']
+        if not subject_is_plural:
+            # Bank words have their forms precomputed; anything else goes through inflect()
+            word = (session.words.forms.get(word) or inflect(word)).third_person
+        # Copy rather than mutate: the word dicts are shared by every poem
+        selected_word = dict(selected_word, word=word)
     
     return selected_word
 
@@ -193,87 +378,43 @@ templates = [
     ['INTERJECTION', 'ARTICLE', 'NOUN', 'VERB', 'ADVERB']
 ]
 
-def generate_sentence(words, main_categories):
-    template = random.choice(templates)
-    
-    # Determine sentence animacy before generating words
-    sentence_animacy = determine_sentence_animacy(template)
-    print(f"  Sentence animacy: {sentence_animacy}")
-    
-    sentence = []
-    selected_words = []  # Track the actual word objects, not just strings
-    
-    # First pass: generate all words except articles and prepositions
-    prev_word = None
-    for i, pos in enumerate(template):
-        if pos == 'ARTICLE':
-            sentence.append('')  # Placeholder for article
-            selected_words.append(None)  # Placeholder for article
-        elif pos == 'PREPOSITION':
-            # Select appropriate preposition based on the previous verb
-            if prev_word and prev_word.get('pos') == 'VERB':
-                preposition = select_appropriate_preposition(prev_word['word'])
-            else:
-                preposition = random.choice(['in', 'on', 'at', 'to', 'from', 'with', 'by', 'through'])
-            sentence.append(preposition)
-            selected_words.append({'word': preposition, 'pos': 'PREPOSITION'})
-        else:
-            word_obj = select_word_with_transition(words, main_categories, pos, prev_word=prev_word, template=template, current_index=i, selected_words=selected_words, sentence_animacy=sentence_animacy)
-            if isinstance(word_obj, dict):
-                sentence.append(word_obj['word'])
-                selected_words.append(word_obj)
-                prev_word = word_obj  # Update previous word for next iteration
-            else:
-                sentence.append(word_obj)
-                selected_words.append(None)
-    
-    # Second pass: fill in articles based on the next word
-    for i, pos in enumerate(template):
-        if pos == 'ARTICLE':
-            next_word = ""
-            if i + 1 < len(sentence):
-                next_word = sentence[i + 1]
-            article = select_article_before_word(next_word)
-            sentence[i] = article
-    
-    # Basic grammar check - ensure we don't have consecutive nouns or verbs inappropriately
-    result = ' '.join(sentence)
-    if result:
-        # Capitalize first word and add punctuation
-        result = result.capitalize() + '.'
-        
-        # Simple validation - if sentence is too short or doesn't make sense, try again
-        if len(sentence) < 3:
-            return generate_sentence(words, main_categories)
-            
-    return result
+def generate_sentence(words, main_categories, session=None):
+    if session is None:
+        session = PoemSession(words)
+    return _compose_sentence(words, main_categories, session)
 
-def generate_poem(words, n_stanzas=3, sentences_per_stanza=4):
-    global used_words
-    used_words.clear()  # Reset used words for new poem
+def generate_poem(words, n_stanzas=3, sentences_per_stanza=4, rng=None, metrics=None):
+    """Generate a poem in its own PoemSession, drawing from rng (the global random module by default).
+    
+    Pass a Metrics as metrics to collect the poem's counters (or a batch's, by reusing it).
+    """
+    session = PoemSession(words, rng, metrics)
+    session.metrics.incr('poems')
+    started = perf_counter()
     
-    main_categories = pick_categories(words)
-    print(f"Poem categories: {main_categories}")
+    main_categories = pick_categories(words, session.rng)
+    session.main_categories = main_categories
+    logger.debug("Poem categories: %s", main_categories)
     
     # Create a narrative arc across stanzas
-    stanza_themes = create_stanza_themes(main_categories, n_stanzas)
+    stanza_themes = create_stanza_themes(main_categories, n_stanzas, session.rng)
     
     poem = []
     for stanza_num in range(n_stanzas):
-        print(f"\n--- Generating Stanza {stanza_num + 1} ---")
-        print(f"Stanza theme: {stanza_themes[stanza_num]}")
+        logger.debug("Generating stanza %d, theme: %s", stanza_num + 1, stanza_themes[stanza_num])
         
         # Generate stanza with thematic focus
-        stanza = generate_thematic_stanza(words, main_categories, stanza_themes[stanza_num], sentences_per_stanza)
+        stanza = generate_thematic_stanza(words, main_categories, stanza_themes[stanza_num], sentences_per_stanza, session)
         poem.extend(stanza)
         
         # Add stanza separation (except after the last stanza)
         if stanza_num < n_stanzas - 1:
             poem.append("")  # Empty line between stanzas
     
+    session.metrics.add_time('poem', perf_counter() - started)
     return '\n'.join(poem)
 
-def create_stanza_themes(main_categories, n_stanzas):
+def create_stanza_themes(main_categories, n_stanzas, rng=None):
     """Create a narrative progression across stanzas"""
     themes = []
     
@@ -288,26 +429,28 @@ def create_stanza_themes(main_categories, n_stanzas):
     else:
         # For other stanza counts, create progressive themes
         theme_options = ['dawn', 'day', 'dusk', 'night', 'storm', 'calm', 'growth', 'decay', 'birth', 'death']
-        themes = random.sample(theme_options, n_stanzas)
+        themes = (rng or random).sample(theme_options, n_stanzas)
     
     return themes
 
-def generate_thematic_stanza(words, main_categories, theme, n_sentences):
+def generate_thematic_stanza(words, main_categories, theme, n_sentences, session=None):
     """Generate a stanza focused on a specific theme"""
+    if session is None:
+        session = PoemSession(words)
     stanza = []
     
     # Select theme-appropriate words
     theme_words = select_theme_words(words, main_categories, theme)
     
     # Use some theme words repeatedly for cohesion
-    repeated_words = random.sample(theme_words, min(2, len(theme_words)))
+    repeated_words = session.rng.sample(theme_words, min(2, len(theme_words)))
     
     for i in range(n_sentences):
         # Mix theme words with regular selection
         if i < 2 and repeated_words:  # Use repeated words in first half
-            sentence = generate_sentence_with_theme(words, main_categories, theme, repeated_words[i % len(repeated_words)])
+            sentence = generate_sentence_with_theme(words, main_categories, theme, repeated_words[i % len(repeated_words)], session)
         else:
-            sentence = generate_sentence(words, main_categories)
+            sentence = generate_sentence(words, main_categories, session)
         
         stanza.append(sentence)
     
@@ -351,123 +494,131 @@ def select_theme_words(words, main_categories, theme):
     
     return theme_words
 
-def generate_sentence_with_theme(words, main_categories, theme, theme_word):
+def generate_sentence_with_theme(words, main_categories, theme, theme_word, session=None):
     """Generate a sentence that incorporates a specific theme word"""
-    template = random.choice(templates)
-    
-    # Determine sentence animacy before generating words
-    sentence_animacy = determine_sentence_animacy(template)
-    print(f"  Sentence animacy: {sentence_animacy}")
+    if session is None:
+        session = PoemSession(words)
+    return _compose_sentence(words, main_categories, session, theme_word)
+
+# Whole-sentence attempts before settling for a short sentence
+MAX_SENTENCE_ATTEMPTS = 4
+MIN_SENTENCE_WORDS = 3
+
+def _compose_sentence(words, main_categories, session, theme_word=None):
+    """Fill a random template, placing theme_word in the first slot it suits.
+    
+    A slot that nothing in the poem's categories and animacy can fill is
+    re-filled on its own from every word with its POS (see _fill_slots).
+    A slot still empty (its POS is missing from the word list) is dropped,
+    with the article before it if it is that article's noun. Only a
+    sentence left with fewer than MIN_SENTENCE_WORDS words is started
+    over, at most MAX_SENTENCE_ATTEMPTS times in all, so tiny word lists
+    can't recurse or loop forever.
+    """
+    rng = session.rng
+    metrics = session.metrics
+    for attempt in range(MAX_SENTENCE_ATTEMPTS):
+        if attempt:
+            metrics.incr('sentence_retries')
+        started = perf_counter()
+        template = rng.choice(templates)
+        
+        # Determine sentence animacy before generating words
+        sentence_animacy = determine_sentence_animacy(template, rng)
+        logger.debug("Sentence animacy: %s", sentence_animacy)
+        metrics.incr('sentences')
+        filling = perf_counter()
+        metrics.add_time('template_selection', filling - started)
+        
+        sentence = _fill_slots(words, main_categories, template, sentence_animacy, session, theme_word)
+        
+        finishing = perf_counter()
+        metrics.add_time('slot_filling', finishing - filling)
+        
+        # Second pass: fill in articles based on the next word, skipping an empty adjective
+        for i, pos in enumerate(template):
+            if pos == 'ARTICLE':
+                if i + 1 == len(sentence):
+                    sentence[i] = select_article_before_word("")
+                    continue
+                noun = next((j for j in range(i + 1, len(template)) if template[j] == 'NOUN'), None)
+                if noun is not None and not sentence[noun]:
+                    continue  # the article's noun was dropped, so the article goes too
+                next_word = next((word for word in sentence[i + 1:] if word), None)
+                if next_word:
+                    sentence[i] = select_article_before_word(next_word)
+        
+        sentence = [word for word in sentence if word]
+        result = ' '.join(sentence)
+        if result:
+            # Capitalize first word and add punctuation
+            result = result.capitalize() + '.'
+        metrics.add_time('post_processing', perf_counter() - finishing)
+        
+        if len(sentence) >= MIN_SENTENCE_WORDS:
+            return result
     
+    metrics.incr('sentence_retries_exhausted')
+    return result
+
+def _fill_slots(words, main_categories, template, sentence_animacy, session, theme_word=None):
+    """First pass over a template: every slot but the articles, which are left ''"""
+    rng = session.rng
     sentence = []
-    selected_words = []
-    
-    # First pass: generate all words except articles and prepositions
+    selected_words = []  # Track the actual word objects, not just strings
     prev_word = None
     for i, pos in enumerate(template):
         if pos == 'ARTICLE':
-            sentence.append('')
+            sentence.append('')  # Placeholder for article
             selected_words.append(None)
-        elif pos == 'PREPOSITION':
+            continue
+        if pos == 'PREPOSITION':
             # Select appropriate preposition based on the previous verb
             if prev_word and prev_word.get('pos') == 'VERB':
-                preposition = select_appropriate_preposition(prev_word['word'])
+                preposition = select_appropriate_preposition(prev_word['word'], rng=rng)
             else:
-                preposition = random.choice(['in', 'on', 'at', 'to', 'from', 'with', 'by', 'through'])
+                preposition = select_appropriate_preposition(None, rng=rng)
             sentence.append(preposition)
             selected_words.append({'word': preposition, 'pos': 'PREPOSITION'})
-        else:
-            # Try to use theme word if it matches the POS and animacy
-            if theme_word and theme_word['pos'] == pos:
-                # Check if theme word matches sentence animacy
-                theme_anim = theme_word.get('pos_anim', theme_word.get('anim', 'inanimate'))
-                if pos in ['NOUN', 'VERB']:
-                    if theme_anim == sentence_animacy or theme_anim == 'both':
-                        word_obj = theme_word
-                        sentence.append(word_obj['word'])
-                        selected_words.append(word_obj)
-                        prev_word = word_obj
-                        theme_word = None  # Use it only once
-                    else:
-                        # Theme word doesn't match animacy, use regular selection
-                        word_obj = select_word_with_transition(words, main_categories, pos, prev_word=prev_word, template=template, current_index=i, selected_words=selected_words, sentence_animacy=sentence_animacy)
-                        if isinstance(word_obj, dict):
-                            sentence.append(word_obj['word'])
-                            selected_words.append(word_obj)
-                            prev_word = word_obj
-                        else:
-                            sentence.append(word_obj)
-                            selected_words.append(None)
-                else:
-                    # For non-noun/verb POS, use theme word
-                    word_obj = theme_word
-                    sentence.append(word_obj['word'])
-                    selected_words.append(word_obj)
-                    prev_word = word_obj
-                    theme_word = None  # Use it only once
+            continue
+        
+        word_obj = None
+        # Try to use theme word if it matches the POS and animacy
+        if theme_word and theme_word['pos'] == pos:
+            theme_anim = theme_word.get('pos_anim', theme_word.get('anim', 'inanimate'))
+            if pos not in ['NOUN', 'VERB'] or theme_anim == sentence_animacy or theme_anim == 'both':
+                word_obj = theme_word
+                theme_word = None  # Use it only once
             else:
-                word_obj = select_word_with_transition(words, main_categories, pos, prev_word=prev_word, template=template, current_index=i, selected_words=selected_words, sentence_animacy=sentence_animacy)
-                if isinstance(word_obj, dict):
-                    sentence.append(word_obj['word'])
-                    selected_words.append(word_obj)
-                    prev_word = word_obj
-                else:
-                    sentence.append(word_obj)
-                    selected_words.append(None)
-    
-    # Second pass: fill in articles
-    for i, pos in enumerate(template):
-        if pos == 'ARTICLE':
-            next_word = ""
-            if i + 1 < len(sentence):
-                next_word = sentence[i + 1]
-            article = select_article_before_word(next_word)
-            sentence[i] = article
-    
-    result = ' '.join(sentence)
-    if result:
-        result = result.capitalize() + '.'
-        if len(sentence) < 3:
-            return generate_sentence_with_theme(words, main_categories, theme, theme_word)
-    
-    return result
+                # Theme word doesn't match animacy, use regular selection
+                session.metrics.incr('animacy_rejections')
+        if word_obj is None:
+            word_obj = select_word_with_transition(words, main_categories, pos, prev_word=prev_word, template=template, current_index=i, selected_words=selected_words, sentence_animacy=sentence_animacy, session=session, strict=True)
+        if not word_obj:
+            # Nothing suits the categories and animacy: re-fill just this slot
+            # from every word with its POS rather than redo the sentence
+            session.metrics.incr('slot_refills')
+            word_obj = select_word_with_transition(words, session.words.main_categories, pos, prev_word=prev_word, template=template, current_index=i, selected_words=selected_words, session=session)
+        
+        if word_obj:
+            sentence.append(word_obj['word'])
+            selected_words.append(word_obj)
+            prev_word = word_obj  # Update previous word for next iteration
+        else:
+            sentence.append('')
+            selected_words.append(None)
+    return sentence
 
 # Simple pluralization rules
 def pluralize(word):
-    if word.endswith('y') and not word.endswith(('ay', 'ey', 'iy', 'oy', 'uy')):
-        return word[:-1] + 'ies'
-    elif word.endswith(('s', 'sh', 'ch', 'x', 'z')):
-        return word + 'es'
-    else:
-        return word + 's'
+    return inflect(word).plural
 
 # Simple verb conjugation for present tense
 def conjugate_verb(word, subject_is_plural=False):
-    print(f"  Conjugating '{word}' (plural: {subject_is_plural})")
+    # Plural subjects take the base form
     if subject_is_plural:
-        result = word  # Base form for plural subjects
-        print(f"  Result: '{result}' (plural form)")
-        return result
-    else:
-        # Simple rules for third person singular
-        # First, check if the word already ends with 's' to avoid double suffixes
-        if word.endswith('s'):
-            result = word  # Already conjugated
-            print(f"  Result: '{result}' (already ends with 's')")
-            return result
-        
-        if word.endswith('y') and not word.endswith(('ay', 'ey', 'iy', 'oy', 'uy')):
-            result = word[:-1] + 'ies'
-            print(f"  Result: '{result}' (y -> ies)")
-            return result
-        elif word.endswith(('s', 'sh', 'ch', 'x', 'z')):
-            result = word + 'es'
-            print(f"  Result: '{result}' (add 'es')")
-            return result
-        else:
-            result = word + 's'
-            print(f"  Result: '{result}' (add 's')")
-            return result
+        return word
+    return inflect(word).third_person
 
 # Check if subject is plural
 def is_plural_subject(template, current_index):
@@ -482,100 +633,16 @@ def is_plural_subject(template, current_index):
 def select_article_before_word(next_word):
     if not next_word:
         return 'the'  # Default fallback
-    
-    # Words that start with vowel sounds (including silent h words)
-    vowel_sound_words = {
-        'a', 'e', 'i', 'o', 'u',  # vowels
-        'hour', 'honor', 'honest', 'heir', 'herb'  # silent h words
-    }
-    
-    # Check if the word starts with a vowel sound
-    if next_word.lower() in vowel_sound_words or next_word.lower().startswith(('a', 'e', 'i', 'o', 'u')):
-        return 'an'
-    else:
-        return 'a'
+    return indefinite_article(next_word)
 
 # Better preposition selection based on verb context
-def select_appropriate_preposition(verb_word, context=None):
+def select_appropriate_preposition(verb_word, context=None, rng=None):
     """Select an appropriate preposition based on the verb and context"""
-    if not verb_word:
-        return random.choice(['in', 'on', 'at', 'to', 'from', 'with', 'by', 'through'])
-    
-    verb = verb_word.lower()
-    
-    # Verb-specific preposition mappings
-    verb_prepositions = {
-        'jump': ['over', 'across', 'through', 'into', 'onto'],
-        'run': ['through', 'across', 'around', 'to', 'from'],
-        'walk': ['through', 'across', 'around', 'to', 'from'],
-        'fly': ['over', 'through', 'across', 'to', 'from'],
-        'swim': ['through', 'across', 'in', 'to', 'from'],
-        'climb': ['up', 'over', 'through', 'onto'],
-        'fall': ['off', 'from', 'through', 'into'],
-        'flow': ['through', 'across', 'into', 'over'],
-        'drift': ['through', 'across', 'over', 'in'],
-        'float': ['through', 'across', 'over', 'in'],
-        'burn': ['through', 'across', 'over', 'in'],
-        'crash': ['into', 'through', 'against', 'onto'],
-        'shatter': ['into', 'against', 'through', 'onto'],
-        'destroy': ['through', 'across', 'over', 'in'],
-        'grow': ['in', 'through', 'across', 'over'],
-        'bloom': ['in', 'through', 'across', 'over'],
-        'shine': ['through', 'across', 'over', 'in'],
-        'glow': ['through', 'across', 'over', 'in'],
-        'sparkle': ['through', 'across', 'over', 'in'],
-        'twinkle': ['through', 'across', 'over', 'in'],
-        'roar': ['through', 'across', 'over', 'in'],
-        'rumble': ['through', 'across', 'over', 'in'],
-        'howl': ['through', 'across', 'over', 'in'],
-        'scream': ['through', 'across', 'over', 'in'],
-        'whisper': ['through', 'across', 'over', 'in'],
-        'speak': ['to', 'with', 'through', 'across'],
-        'listen': ['to', 'for', 'through', 'across'],
-        'watch': ['over', 'through', 'across', 'in'],
-        'see': ['through', 'across', 'over', 'in'],
-        'hear': ['through', 'across', 'over', 'in'],
-        'feel': ['through', 'across', 'over', 'in'],
-        'touch': ['through', 'across', 'over', 'in'],
-        'love': ['through', 'across', 'over', 'in'],
-        'hate': ['through', 'across', 'over', 'in'],
-        'fear': ['through', 'across', 'over', 'in'],
-        'hope': ['for', 'through', 'across', 'over'],
-        'dream': ['of', 'about', 'through', 'across'],
-        'think': ['about', 'of', 'through', 'across'],
-        'know': ['about', 'of', 'through', 'across'],
-        'learn': ['about', 'from', 'through', 'across'],
-        'teach': ['to', 'about', 'through', 'across'],
-        'grow': ['in', 'through', 'across', 'over'],
-        'bloom': ['in', 'through', 'across', 'over'],
-        'wilt': ['in', 'through', 'across', 'over'],
-        'wither': ['in', 'through', 'across', 'over'],
-        'fade': ['in', 'through', 'across', 'over'],
-        'shine': ['through', 'across', 'over', 'in'],
-        'glow': ['through', 'across', 'over', 'in'],
-        'sparkle': ['through', 'across', 'over', 'in'],
-        'twinkle': ['through', 'across', 'over', 'in'],
-        'blaze': ['through', 'across', 'over', 'in'],
-        'roar': ['through', 'across', 'over', 'in'],
-        'rumble': ['through', 'across', 'over', 'in'],
-        'howl': ['through', 'across', 'over', 'in'],
-        'scream': ['through', 'across', 'over', 'in'],
-        'wail': ['through', 'across', 'over', 'in'],
-        'moan': ['through', 'across', 'over', 'in'],
-        'groan': ['through', 'across', 'over', 'in']
-    }
-    
-    # Check if we have specific prepositions for this verb
-    if verb in verb_prepositions:
-        return random.choice(verb_prepositions[verb])
-    
-    # Default prepositions for general use
-    default_prepositions = ['in', 'on', 'at', 'to', 'from', 'with', 'by', 'through', 'across', 'over', 'around', 'into', 'onto', 'off', 'up', 'down']
-    
-    return random.choice(default_prepositions)
+    rng = rng or random
+    return rng.choice(prepositions_for(verb_word))
 
 # Determine sentence animacy before generation
-def determine_sentence_animacy(template):
+def determine_sentence_animacy(template, rng=None):
     """Determine if a sentence should be animate or inanimate based on template structure"""
     # Look for patterns that suggest animate subjects
     animate_indicators = ['INTERJECTION', 'VERB']  # Interjections often suggest animate subjects
@@ -596,10 +663,12 @@ def determine_sentence_animacy(template):
         return 'inanimate'
     else:
         # Random choice for balanced templates
-        return random.choice(['animate', 'inanimate'])
+        return (rng or random).choice(['animate', 'inanimate'])
 
 def filter_words_by_animacy(words, main_categories, pos, sentence_animacy, category=None):
     """Filter words by category, POS, and sentence animacy"""
+    if isinstance(words, WordList):
+        return list(words.pool(main_categories, pos, sentence_animacy, category))
     filtered = []
     
     for word in words:
@@ -624,13 +693,112 @@ def filter_words_by_animacy(words, main_categories, pos, sentence_animacy, categ
     
     return filtered
 
+# Batch generation
+# Word list used by pool workers; set once per worker process by the pool
+# initializer. Records travel as plain dicts (mapping proxies don't pickle)
+_worker_words = None
+
+def _init_worker(words, model=None):
+    global _worker_words
+    _worker_words = WordList(words, model)
+
+def seeded_rng(seed, index=0):
+    """The generator for poem ``index`` of a batch seeded with ``seed``.
+
+    Every seeded poem2 poem draws from this, whether it comes from a batch,
+    the CLI's single poem (index 0) or poem_server, so a seed gives the same
+    poem everywhere.
+    """
+    return random.Random(f"{seed}:{index}")
+
+def _generate_seeded_poem(words, base_seed, index, n_stanzas, sentences_per_stanza, metrics=None):
+    """Generate poem ``index`` of a batch from its own seed, independent of the poems before it"""
+    return generate_poem(words, n_stanzas, sentences_per_stanza, rng=seeded_rng(base_seed, index), metrics=metrics)
+
+def _generate_chunk(task):
+    start, stop, base_seed, n_stanzas, sentences_per_stanza = task
+    metrics = Metrics()
+    poems = [_generate_seeded_poem(_worker_words, base_seed, i, n_stanzas, sentences_per_stanza, metrics) for i in range(start, stop)]
+    return poems, metrics.snapshot()
+
+def _collect_chunk(future, metrics):
+    poems, counters = future.result()
+    if metrics is not None:
+        metrics.merge(counters)
+    return poems
+
+def generate_poems(n, seed=None, workers=None, filename="words2.txt", n_stanzas=3, sentences_per_stanza=4, chunk_size=64, corpus_paths=None, metrics=None):
+    """Generate n poems, yielding them in order as they complete.
+
+    The word list is loaded once and shared with a pool of ``workers``
+    processes (default: one per CPU; 1 runs in this process). Poem i is
+    seeded from (seed, i) by seeded_rng, so a batch is reproducible for a
+    given seed whatever the worker count, and its first poem is the one a
+    single run with that seed gives. At most a few chunks per worker are in
+    flight at once, so memory stays bounded for very large batches.
+    corpus_paths, if given, trains a TransitionModel to weight word choice.
+    Counters for the whole batch are added to metrics, if given.
+    """
+    words = load_words(filename, corpus_paths, metrics)
+    if seed is None:
+        seed = random.getrandbits(64)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    if workers == 1:
+        for i in range(n):
+            yield _generate_seeded_poem(words, seed, i, n_stanzas, sentences_per_stanza, metrics)
+        return
+    
+    tasks = (
+        (start, min(start + chunk_size, n), seed, n_stanzas, sentences_per_stanza)
+        for start in range(0, n, chunk_size)
+    )
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=([dict(w) for w in words], words.model)) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_generate_chunk, task))
+            if len(pending) >= max_pending:
+                yield from _collect_chunk(pending.popleft(), metrics)
+        while pending:
+            yield from _collect_chunk(pending.popleft(), metrics)
+
 if __name__ == "__main__":
-    words = load_words("words2.txt")
-    poem = generate_poem(words)
-    
-    # Write the poem to output.txt
-    with open("output.txt", "w") as f:
-        f.write(poem)
-    
-    print("Poem generated and saved to output.txt:")
-    print(poem)
+    import argparse
+    import contextlib
+    
+    parser = argparse.ArgumentParser(description="Generate themed poems from words2.txt")
+    parser.add_argument("--count", type=int, default=1, help="Number of poems to generate")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible output; --count N repeats the --count 1 poem first")
+    parser.add_argument("--workers", type=int, help="Worker processes for --count > 1 (default: one per CPU)")
+    parser.add_argument("--corpus", nargs="*", default=list(DEFAULT_CORPORA),
+                        help="Text files to learn word transitions from (none: use the built-in table)")
+    parser.add_argument("--verbose", action="store_true", help="Log per-sentence traces")
+    parser.add_argument("--metrics", action="store_true", help="Print counters and stage timings as JSON")
+    parser.add_argument("--profile", metavar="FILE", help="Write cProfile stats for the run to FILE")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+    metrics = Metrics()
+    
+    with metrics.profile(args.profile) if args.profile else contextlib.nullcontext():
+        if args.count == 1:
+            poem = next(generate_poems(1, seed=args.seed, workers=1, corpus_paths=args.corpus, metrics=metrics))
+            
+            # Write the poem to output.txt
+            with open("output.txt", "w") as f:
+                f.write(poem)
+            
+            print("Poem generated and saved to output.txt:")
+            print(poem)
+        else:
+            # Stream the batch to output.txt, one blank line between poems
+            with open("output.txt", "w") as f:
+                for i, poem in enumerate(generate_poems(args.count, seed=args.seed, workers=args.workers, corpus_paths=args.corpus, metrics=metrics)):
+                    if i:
+                        f.write("\n\n")
+                    f.write(poem)
+            print(f"{args.count} poems generated and saved to output.txt")
+    
+    if args.metrics:
+        print(metrics.to_json(indent=2))
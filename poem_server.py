@@ -0,0 +1,335 @@
+"""Local HTTP/JSON service serving every poem generator from preloaded data.
+
+Built on asyncio streams, so it needs nothing beyond the generators' own
+dependencies. Word banks are loaded and the Frost models trained once; a
+pool of worker processes then loads them at start-up (the Frost models
+are mapped from artifacts written by this process) and generates poems
+off the event loop. Endpoints::
+
+    GET /poem?engine=poem2&stanzas=3&seed=42   {"engine", "seed", "stanzas", "poem"}
+    GET /health                                {"engines": [...]}
+    GET /metrics                               Metrics snapshot; worker names start with the engine
+
+Engines are poem, poem2, markov (frost_markov) and hmm (frost_hmm), set up
+and formatted as their CLIs do by default. A request for three stanzas
+(the length poem.py and poem2.py write) gives the poem those CLIs print
+for the same ``--seed``; the Frost engines write ``4 * stanzas`` lines in
+one block, as their CLIs print ``--lines``. poem2 weights words with the
+transition model learned from its default corpora and seeds poems with
+poem2.seeded_rng. Seeds that aren't integers are used as strings.
+
+Requests for an engine that arrive within ``--batch-delay`` of each other
+are sent to a worker together, up to ``--batch-size``, and once
+``--max-pending`` requests are waiting new ones get 503 with Retry-After
+instead of queueing without bound. Run::
+
+    python poem_server.py --engines poem poem2 --port 8080
+    python benchmarks/loadtest.py --port 8080 --engine poem2
+
+Generating poems never writes output.txt.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from metrics import Metrics
+
+ENGINES = ("poem", "poem2", "markov", "hmm")
+MAX_STANZAS = 20
+
+#############################
+# Worker side
+#############################
+
+Seed = Union[int, str]
+
+# Engine name -> loaded word list or model; filled once per worker process
+_engines: Dict[str, object] = {}
+
+
+def _load_engine(name: str, artifacts: Dict[str, object]):
+    if name == "poem":
+        import poem
+        return poem
+    if name == "poem2":
+        import poem2
+        records, model = artifacts[name]
+        return poem2.WordList(records, model)
+    if name == "markov":
+        from frost_markov import TrigramModel
+        return TrigramModel.load(artifacts[name])
+    if name == "hmm":
+        from frost_hmm import HiddenMarkovPoet
+        return HiddenMarkovPoet.load(artifacts[name])
+    raise ValueError(f"unknown engine {name!r}")
+
+
+def _init_worker(engines: Sequence[str], artifacts: Dict[str, object]):
+    for name in engines:
+        _engines[name] = _load_engine(name, artifacts)
+
+
+def _generate(name: str, seed: Seed, stanzas: int, metrics: Metrics) -> str:
+    engine = _engines[name]
+    if name == "poem":
+        poem = engine.generate_poem(num_stanzas=stanzas, metrics=metrics, rng=random.Random(seed))
+        return engine.format_poem(poem)
+    if name == "poem2":
+        import poem2
+        return poem2.generate_poem(engine, n_stanzas=stanzas, rng=poem2.seeded_rng(seed), metrics=metrics)
+    rng = random.Random(seed)
+    if name == "markov":
+        from frost_markov import build_poem
+        lines = build_poem(engine, n_lines=4 * stanzas, metrics=metrics, rng=rng)
+    else:
+        lines = engine.generate_poem(n_lines=4 * stanzas, metrics=metrics, rng=rng)
+    return "\n".join(lines)
+
+
+def _generate_batch(name: str, requests: List[Tuple[Seed, int]]) -> Tuple[List[str], dict]:
+    """Generate one poem per (seed, stanzas) request in a worker; returns the poems and a metrics snapshot."""
+    metrics = Metrics()
+    poems = [_generate(name, seed, stanzas, metrics) for seed, stanzas in requests]
+    return poems, metrics.snapshot()
+
+
+def _train_artifacts(engines: Sequence[str], corpus: Sequence[str], directory: str) -> Dict[str, object]:
+    """Train the models once for the workers.
+
+    Frost models are saved for the workers to map; poem2's word records and
+    transition model are picklable and passed as they are.
+    """
+    from corpus import expand_paths
+
+    paths = expand_paths(corpus)
+    artifacts: Dict[str, object] = {}
+    if "poem2" in engines:
+        import poem2
+        words = poem2.load_words("words2.txt", poem2.DEFAULT_CORPORA)
+        artifacts["poem2"] = ([dict(w) for w in words], words.model)
+    if "markov" in engines:
+        from frost_markov import TrigramModel
+        model = TrigramModel()
+        model.train(paths, workers=None)
+        artifacts["markov"] = os.path.join(directory, "markov.bin")
+        model.save(artifacts["markov"])
+    if "hmm" in engines:
+        from frost_hmm import HiddenMarkovPoet
+        poet = HiddenMarkovPoet()
+        poet.train_corpus(paths, workers=None)
+        artifacts["hmm"] = os.path.join(directory, "hmm.bin")
+        poet.save(artifacts["hmm"])
+    return artifacts
+
+#############################
+# Server side
+#############################
+
+def _parse_seed(value: str) -> Seed:
+    """Read a seed as the CLIs' ``--seed`` does, keeping non-integers as strings."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class _Batcher:
+    """Collects one engine's requests and sends them to the pool in batches."""
+
+    def __init__(self, service: "PoemService", engine: str):
+        self.service = service
+        self.engine = engine
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # The loop only keeps weak references to tasks
+        self.dispatches: Set[asyncio.Task] = set()
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        service = self.service
+        while True:
+            batch = [await self.queue.get()]
+            if service.batch_delay > 0:
+                await asyncio.sleep(service.batch_delay)
+            while len(batch) < service.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            task = asyncio.create_task(self.dispatch(batch))
+            self.dispatches.add(task)
+            task.add_done_callback(self.dispatches.discard)
+
+    async def dispatch(self, batch: List[Tuple[Seed, int, asyncio.Future]]):
+        service = self.service
+        service.metrics.incr("batches")
+        service.metrics.observe("batch_size", len(batch))
+        loop = asyncio.get_running_loop()
+        try:
+            poems, snapshot = await loop.run_in_executor(
+                service.pool, _generate_batch, self.engine, [(seed, stanzas) for seed, stanzas, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        service.metrics.merge(snapshot, prefix=f"{self.engine}.")
+        for (_, _, future), poem in zip(batch, poems):
+            if not future.done():
+                future.set_result(poem)
+
+
+class PoemService:
+    """Routes HTTP requests to per-engine batchers in front of a process pool."""
+
+    def __init__(
+        self,
+        pool: ProcessPoolExecutor,
+        engines: Sequence[str],
+        batch_size: int = 8,
+        batch_delay: float = 0.002,
+        max_pending: int = 256,
+    ):
+        self.pool = pool
+        self.engines = tuple(engines)
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.pending = 0
+        self.metrics = Metrics()
+        self._batchers: Dict[str, _Batcher] = {}
+
+    async def poem(self, engine: str, seed: Seed, stanzas: int) -> str:
+        if self.pending >= self.max_pending:
+            self.metrics.incr("rejected")
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "too many pending requests", {"Retry-After": "1"})
+        batcher = self._batchers.get(engine)
+        if batcher is None:
+            batcher = self._batchers[engine] = _Batcher(self, engine)
+        future = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        try:
+            await batcher.queue.put((seed, stanzas, future))
+            return await future
+        finally:
+            self.pending -= 1
+
+    async def route(self, method: str, target: str) -> dict:
+        if method != "GET":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed", {"Allow": "GET"})
+        url = urlsplit(target)
+        if url.path == "/health":
+            return {"engines": list(self.engines), "pending": self.pending}
+        if url.path == "/metrics":
+            return self.metrics.snapshot()
+        if url.path != "/poem":
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no such endpoint: {url.path}")
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        engine = query.get("engine", self.engines[0])
+        if engine not in self.engines:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"engine must be one of {', '.join(self.engines)}")
+        try:
+            stanzas = int(query.get("stanzas", 3))
+        except ValueError:
+            stanzas = 0
+        if not 1 <= stanzas <= MAX_STANZAS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"stanzas must be an integer from 1 to {MAX_STANZAS}")
+        seed = _parse_seed(query["seed"]) if query.get("seed") else random.getrandbits(63)
+        return {"engine": engine, "seed": seed, "stanzas": stanzas, "poem": await self.poem(engine, seed, stanzas)}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection, keeping it alive unless asked not to."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                started = asyncio.get_running_loop().time()
+                parts = request_line.decode("latin-1").split()
+                keep_alive = len(parts) == 3 and parts[2] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                extra: Dict[str, str] = {}
+                try:
+                    if len(parts) != 3:
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+                    status, body = HTTPStatus.OK, await self.route(parts[0], parts[1])
+                except HTTPError as e:
+                    status, body, extra = e.status, {"error": str(e)}, e.headers
+                except Exception as e:
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+                self.metrics.incr(f"responses_{status.value}")
+                self.metrics.add_time("request", asyncio.get_running_loop().time() - started)
+
+                payload = json.dumps(body).encode("utf-8")
+                head = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(payload)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                head.extend(f"{name}: {value}" for name, value in extra.items())
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args, artifacts: Dict[str, object]):
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(args.engines, artifacts)) as pool:
+        service = PoemService(pool, args.engines, args.batch_size, args.batch_delay, args.max_pending)
+        server = await asyncio.start_server(service.handle, args.host, args.port)
+        print(f"Serving {', '.join(args.engines)} on http://{args.host}:{args.port} with {workers} workers")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve poems from every generator over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=["poem", "poem2"])
+    parser.add_argument("--corpus", nargs="+", default=["frost_poems.txt"], help="Corpus files or globs for the markov and hmm engines")
+    parser.add_argument("--workers", type=int, help="Generator processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Most requests sent to a worker at once")
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="Seconds to wait for more requests to batch")
+    parser.add_argument("--max-pending", type=int, default=256, help="Requests waiting before new ones get 503")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        artifacts = _train_artifacts(args.engines, args.corpus, directory)
+        try:
+            asyncio.run(serve(args, artifacts))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Learned POS x category transition and emission model for poem2.
+
+States are the (pos, category) pairs of a poem2 word list. The model is
+estimated from plain-text corpora: every token found in the word list is
+tagged with its record's state, and within each sentence the model counts
+which state follows which. Everything lives in NumPy arrays::
+
+    start       (S,)     P(state of the first tagged word in a sentence)
+    transition  (S, S)   P(next state | previous state)
+    emission    (V,)     P(word record | its state), V = number of records
+
+Every record has exactly one state, so emissions are stored per record.
+Emissions are learned from corpus word counts but smoothed heavily
+(``EMISSION_ALPHA`` pseudo-counts per record), since raw frequencies would
+pile the draws onto a few common words. Add-alpha smoothing keeps every
+transition possible, so the model only reweights the candidates that
+poem2's templates and pools already allow.
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Stand-in for the previous word's state at the start of a sentence
+START = -1
+# Pseudo-count added to every record's corpus count
+EMISSION_ALPHA = 10.0
+
+_SENTENCE_BREAK = re.compile(r"[.!?;:]+|\n\s*\n")
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _sentences(paths: Sequence[str]) -> Iterator[str]:
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            yield from _SENTENCE_BREAK.split(f.read().lower())
+
+
+def _forms(token: str) -> Iterator[str]:
+    """Yield ``token`` and the base forms it may be inflected from."""
+    yield token
+    if token.endswith("ies"):
+        yield token[:-3] + "y"
+    if token.endswith("es"):
+        yield token[:-2]
+    if token.endswith(("s", "d")):
+        yield token[:-1]
+    if token.endswith("ed"):
+        yield token[:-2]
+
+
+class TransitionModel:
+    """Start/transition matrices and per-record emissions over a word list's (pos, category) states."""
+
+    def __init__(
+        self,
+        states: Sequence[Tuple[str, str]],
+        word_states: np.ndarray,
+        start: np.ndarray,
+        transition: np.ndarray,
+        emission: np.ndarray,
+        word_text_states: Mapping[Tuple[str, str], int],
+    ):
+        self.states = tuple(states)
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+        # state id of every word record, indexed like the word list
+        self.word_states = word_states
+        self.start = start
+        self.transition = transition
+        self.emission = emission
+        # (word, pos) -> state, for previous words that carry no category
+        self.word_text_states = dict(word_text_states)
+        # Next-state distribution when the previous word's state is unknown
+        self.marginal = transition.mean(axis=0)
+
+    @classmethod
+    def train(
+        cls,
+        words: Sequence[Mapping[str, str]],
+        corpus_paths: Sequence[str],
+        alpha: float = 0.1,
+        emission_alpha: float = EMISSION_ALPHA,
+    ) -> "TransitionModel":
+        """Estimate the model for ``words`` (poem2 word records) from text files.
+
+        ``alpha`` smooths the start and transition counts, ``emission_alpha``
+        the per-record word counts.
+        """
+        states = sorted({(w["pos"], w["category"]) for w in words})
+        state_ids = {state: i for i, state in enumerate(states)}
+        word_states = np.array([state_ids[(w["pos"], w["category"])] for w in words], dtype=np.intp)
+
+        records_by_text: Dict[str, List[int]] = defaultdict(list)
+        word_text_states = {}
+        for i, w in enumerate(words):
+            records_by_text[w["word"].lower()].append(i)
+            word_text_states.setdefault((w["word"].lower(), w["pos"]), int(word_states[i]))
+
+        # A token matching several records is shared evenly between them
+        emitted: List[int] = []
+        emitted_weight: List[float] = []
+        first: List[int] = []
+        first_weight: List[float] = []
+        rows: List[int] = []
+        cols: List[int] = []
+        pair_weight: List[float] = []
+        for sentence in _sentences(corpus_paths):
+            prev: Optional[List[int]] = None
+            for token in _TOKEN.findall(sentence):
+                ids = next((records_by_text[form] for form in _forms(token) if form in records_by_text), None)
+                if ids is None:
+                    continue
+                share = 1.0 / len(ids)
+                emitted.extend(ids)
+                emitted_weight.extend([share] * len(ids))
+                if prev is None:
+                    first.extend(ids)
+                    first_weight.extend([share] * len(ids))
+                else:
+                    weight = share / len(prev)
+                    for p in prev:
+                        rows.extend([p] * len(ids))
+                        cols.extend(ids)
+                        pair_weight.extend([weight] * len(ids))
+                prev = ids
+
+        n_states = len(states)
+        start = np.full(n_states, alpha)
+        np.add.at(start, word_states[first], first_weight)
+        transition = np.full((n_states, n_states), alpha)
+        np.add.at(transition, (word_states[rows], word_states[cols]), pair_weight)
+        emission = np.full(len(words), emission_alpha, dtype=float)
+        np.add.at(emission, np.asarray(emitted, dtype=np.intp), emitted_weight)
+
+        start /= start.sum()
+        transition /= transition.sum(axis=1, keepdims=True)
+        emission /= np.bincount(word_states, weights=emission, minlength=n_states)[word_states]
+        return cls(states, word_states, start, transition, emission, word_text_states)
+
+    def state_of(self, word: Optional[Mapping[str, str]]) -> Optional[int]:
+        """Return the state of a selected word, START for None, or None if it is unknown."""
+        if word is None:
+            return START
+        state = self.state_ids.get((word.get("pos"), word.get("category")))
+        if state is None:
+            state = self.word_text_states.get((word.get("word", "").lower(), word.get("pos")))
+        return state
+
+    def weights(self, prev_state: Optional[int], word_ids: np.ndarray) -> np.ndarray:
+        """Unnormalised probabilities of the records ``word_ids`` following ``prev_state``."""
+        if prev_state == START:
+            row = self.start
+        elif prev_state is None:
+            row = self.marginal
+        else:
+            row = self.transition[prev_state]
+        cand_states = self.word_states[word_ids]
+        return row[cand_states] * self.emission[word_ids]
+
+    def cumulative_weights(self, prev_state: Optional[int], word_ids: Sequence[int]) -> np.ndarray:
+        return np.cumsum(self.weights(prev_state, np.asarray(word_ids, dtype=np.intp)))
+
+    @staticmethod
+    def sample(cum_weights: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+        """Map a uniform in [0, 1), or a batch of them, to indices into a cumulative weight vector."""
+        picks = np.searchsorted(cum_weights, np.asarray(uniforms) * cum_weights[-1], side="right")
+        return np.minimum(picks, len(cum_weights) - 1)
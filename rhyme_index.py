@@ -0,0 +1,86 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+from sampling import AliasTable
+
+#############################
+# CMUdict rhyme index
+#############################
+
+class RhymeIndex:
+    """Rhyme lookups restricted to a model's vocabulary, built once from CMUdict.
+
+    Two uniform-weight AliasTables hold the index so it can be saved in and
+    mapped from a model artifact: ``word_parts`` maps a word id to the ids of
+    its rhyming parts (one per pronunciation) and ``part_words`` maps a
+    rhyming part id to the vocabulary words ending in it. Rhymes match
+    ``pronouncing.rhymes`` but only ever return vocabulary words.
+    """
+
+    TABLES = ("rhyme_parts", "rhyme_words")
+
+    def __init__(
+        self,
+        vocab: Sequence[str],
+        word_parts: AliasTable,
+        part_words: AliasTable,
+        word_ids: Optional[Dict[str, int]] = None,
+        cache_size: int = 4096,
+    ):
+        self.vocab = vocab
+        self.word_ids = word_ids if word_ids is not None else {w: i for i, w in enumerate(vocab)}
+        self.word_parts = word_parts
+        self.part_words = part_words
+        self.rhymes = lru_cache(maxsize=cache_size)(self._rhymes)
+
+    @classmethod
+    def build(cls, vocab: Sequence[str], word_ids: Optional[Dict[str, int]] = None) -> "RhymeIndex":
+        import pronouncing
+
+        pronouncing.init_cmu()
+        if word_ids is None:
+            word_ids = {w: i for i, w in enumerate(vocab)}
+        part_ids: Dict[str, int] = {}
+        word_parts: defaultdict[int, Dict[int, float]] = defaultdict(dict)
+        part_words: defaultdict[int, Dict[int, float]] = defaultdict(dict)
+        for word, phones in pronouncing.pronunciations:
+            word_id = word_ids.get(word)
+            if word_id is None:
+                continue
+            part_id = part_ids.setdefault(pronouncing.rhyming_part(phones), len(part_ids))
+            word_parts[word_id][part_id] = 1.0
+            part_words[part_id][word_id] = 1.0
+        return cls(vocab, AliasTable.build(word_parts), AliasTable.build(part_words), word_ids)
+
+    @classmethod
+    def from_tables(
+        cls,
+        vocab: Sequence[str],
+        tables: Dict[str, AliasTable],
+        word_ids: Optional[Dict[str, int]] = None,
+    ) -> Optional["RhymeIndex"]:
+        """Rebuild an index from artifact tables, or return None if they were not saved."""
+        if not all(name in tables for name in cls.TABLES):
+            return None
+        return cls(vocab, tables["rhyme_parts"], tables["rhyme_words"], word_ids)
+
+    def tables(self) -> Dict[str, AliasTable]:
+        return {"rhyme_parts": self.word_parts, "rhyme_words": self.part_words}
+
+    def _rhymes(self, word: str) -> Tuple[str, ...]:
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            return ()
+        row = self.word_parts.find(word_id)
+        if row < 0:
+            return ()
+        found: Dict[int, None] = {}
+        for part_id in self.word_parts.row_items(row):
+            for other in self.part_words.row_items(self.part_words.find(part_id)):
+                if other != word_id:
+                    found[other] = None
+        return tuple(self.vocab[i] for i in found)
+
+    def has_rhymes(self, word: str) -> bool:
+        return bool(self.rhymes(word))
@@ -0,0 +1,113 @@
+import random
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+#############################
+# Discrete samplers
+#############################
+
+def _alias_arrays(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """Build Vose alias-method probability and alias columns for ``weights``."""
+    n = len(weights)
+    total = float(sum(weights))
+    scaled = [w * n / total for w in weights]
+    prob = [0.0] * n
+    alias = list(range(n))
+
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    # Whatever is left is 1.0 up to rounding error
+    for i in large + small:
+        prob[i] = 1.0
+    return prob, alias
+
+
+class AliasTable:
+    """Many discrete distributions over integer items, packed into flat arrays.
+
+    Row ``r`` is the distribution for ``keys[r]`` and covers
+    ``items[offsets[r]:offsets[r + 1]]``. Keys are sorted, so rows are found by
+    bisection, and every draw is O(1) with one ``rng.random()`` call (Vose's
+    alias method). The columns may be ``array.array`` objects or memoryviews
+    over an mmap'd artifact; the table never copies them.
+    """
+
+    __slots__ = ("keys", "offsets", "items", "prob", "alias", "backoff")
+
+    # column name -> array typecode
+    COLUMNS = {"keys": "Q", "offsets": "I", "items": "I", "prob": "f", "alias": "I", "backoff": "f"}
+
+    def __init__(self, keys, offsets, items, prob, alias, backoff):
+        self.keys = keys
+        self.offsets = offsets
+        self.items = items
+        self.prob = prob
+        self.alias = alias
+        # per-row probability of backing off to a lower-order table
+        self.backoff = backoff
+
+    @classmethod
+    def build(
+        cls,
+        rows: Mapping[int, Mapping[int, float]],
+        backoff: Optional[Mapping[int, float]] = None,
+    ) -> "AliasTable":
+        """Compile ``key -> {item: weight}`` rows into a table. Empty rows are dropped."""
+        return cls.build_groups(
+            (key, list(rows[key]), list(rows[key].values()), backoff.get(key, 0.0) if backoff else 0.0)
+            for key in sorted(rows)
+        )
+
+    @classmethod
+    def build_groups(cls, groups: Iterable[Tuple[int, Sequence[int], Sequence[float], float]]) -> "AliasTable":
+        """Compile ``(key, items, weights, backoff)`` rows, given in ascending key order."""
+        columns = {name: array(code) for name, code in cls.COLUMNS.items()}
+        columns["offsets"].append(0)
+        for key, items, weights, backoff in groups:
+            row = [(item, weight) for item, weight in zip(items, weights) if weight > 0]
+            if not row:
+                continue
+            prob, alias = _alias_arrays([weight for _, weight in row])
+            columns["keys"].append(key)
+            columns["items"].extend(item for item, _ in row)
+            columns["prob"].extend(prob)
+            columns["alias"].extend(alias)
+            columns["offsets"].append(len(columns["items"]))
+            columns["backoff"].append(backoff)
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def find(self, key: int) -> int:
+        """Return the row index for ``key``, or -1 if the table has no such row."""
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return -1
+
+    def row_items(self, row: int) -> Sequence[int]:
+        return self.items[self.offsets[row]:self.offsets[row + 1]]
+
+    def sample(self, row: int, rng: Optional[random.Random] = None) -> int:
+        start = self.offsets[row]
+        n = self.offsets[row + 1] - start
+        u = (rng or random).random() * n
+        i = min(int(u), n - 1)
+        if u - i < self.prob[start + i]:
+            return self.items[start + i]
+        return self.items[start + self.alias[start + i]]
+
+    def columns(self) -> Dict[str, Sequence]:
+        return {name: getattr(self, name) for name in self.COLUMNS}
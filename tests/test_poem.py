@@ -0,0 +1,46 @@
+"""poem's WordBank indexes and template filling."""
+
+import random
+
+import pytest
+
+import poem
+from lexicon import indefinite_article
+from poem import WordBank
+
+
+def _bank():
+    return WordBank({
+        "child": {"pos": "noun", "animacy": "animate", "category": "people", "rhyme_group": "ild"},
+        "stone": {"pos": "noun", "animacy": "inanimate", "category": "nature", "rhyme_group": "one"},
+        "sings": {"pos": "verb", "animacy": "human", "category": "action", "rhyme_group": "ings"},
+        "falls": {"pos": "verb", "animacy": "natural", "category": "action", "rhyme_group": "alls"},
+        "waits": {"pos": "verb", "animacy": "unknown", "category": "effort", "rhyme_group": "aits"},
+    })
+
+
+def test_by_animacy():
+    bank = _bank()
+    assert bank.by_animacy["animate"] == ("child",)
+    assert bank.by_animacy["natural"] == ("falls",)
+
+
+def test_verbs_for_animacy():
+    bank = _bank()
+    assert bank.verbs_for_animacy("animate") == ("sings", "falls")
+    assert bank.verbs_for_animacy("inanimate") == ("falls",)
+    assert bank.verbs_for_animacy("unknown") == ("sings", "falls", "waits")
+
+
+def test_article_agrees_with_forced_word():
+    words = poem.get_template_words("any", rng=random.Random(0))
+    assert poem.fill_template("{article} {noun}", words, force_last_word="apple") == "an apple"
+    assert poem.fill_template("{article} {noun}", words, force_last_word="pear") == "a pear"
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_article_agrees_with_filled_adjective(seed):
+    rng = random.Random(seed)
+    words = poem.get_template_words("any", rng=rng)
+    article, adjective, _ = poem.fill_template("{article} {adjective} {noun}", words, rng=rng).split()
+    assert article == indefinite_article(adjective)
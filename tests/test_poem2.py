@@ -0,0 +1,54 @@
+"""poem2 fills what it can from small or filtered word lists."""
+
+import pytest
+
+import poem2
+from metrics import Metrics
+
+ARTICLES = {"a", "an", "the"}
+SEEDS = range(5)
+
+
+def _words(keep):
+    return poem2.WordList([w for w in poem2.load_words("words2.txt") if keep(w)])
+
+
+def _generate(words):
+    metrics = Metrics()
+    poems = [poem2.generate_poem(words, rng=poem2.seeded_rng(seed), metrics=metrics) for seed in SEEDS]
+    return poems, metrics
+
+
+def _tokens(poem):
+    return [token.strip(".,;:!?").lower() for token in poem.split()]
+
+
+def test_slot_refilled_without_retry():
+    # No animate nouns: animate sentences re-fill the noun slot from the other nouns
+    words = _words(lambda w: not (w['pos'] == 'NOUN' and w['pos_anim'] == 'animate'))
+    poems, metrics = _generate(words)
+    assert all(poems)
+    assert metrics["slot_refills"] > 0
+    assert metrics["sentence_retries"] == 0
+    assert metrics["empty_slots"] == 0
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_article_dropped_with_its_noun(seed):
+    # No nouns at all: every noun slot stays empty and takes its article with it
+    words = _words(lambda w: w['pos'] != 'NOUN')
+    metrics = Metrics()
+    poem = poem2.generate_poem(words, rng=poem2.seeded_rng(seed), metrics=metrics)
+    tokens = _tokens(poem)
+    assert tokens
+    assert not ARTICLES & set(tokens)
+    assert metrics["empty_slots"] > 0
+    assert metrics["sentence_retries"] > 0
+
+
+def test_plain_list_rejected():
+    records = list(poem2.load_words("words2.txt"))
+    with pytest.raises(TypeError, match="WordList"):
+        poem2.generate_sentence(records, ["nature"])
+    with pytest.raises(TypeError, match="WordList"):
+        poem2.select_word_with_transition(records, ["nature"], "NOUN")
@@ -0,0 +1,65 @@
+"""poem_server serves the poem each CLI prints for the same seed."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import poem_server
+from metrics import Metrics
+
+SEED = 42
+STANZAS = 3
+
+# nltk data each Frost engine needs, by nltk.data path
+NLTK_DATA = {
+    "markov": ("tokenizers/punkt", "tokenizers/punkt_tab"),
+    "hmm": ("tokenizers/punkt", "tokenizers/punkt_tab", "taggers/averaged_perceptron_tagger"),
+}
+
+
+def _require_nltk(engine):
+    nltk = pytest.importorskip("nltk")
+    for resource in NLTK_DATA[engine]:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            pytest.skip(f"nltk data {resource} is not installed")
+
+
+def _serve(engine, directory, seed=SEED, stanzas=STANZAS):
+    artifacts = poem_server._train_artifacts([engine], ["frost_poems.txt"], str(directory))
+    poem_server._init_worker([engine], artifacts)
+    return poem_server._generate(engine, poem_server._parse_seed(str(seed)), stanzas, Metrics())
+
+
+def _cli(*args, cwd):
+    result = subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_poem_matches_cli(repo_root, tmp_path):
+    printed = _cli("poem.py", "--seed", str(SEED), cwd=repo_root)
+    assert _serve("poem", tmp_path) == printed.strip()
+
+
+def test_poem2_matches_cli(repo_root, tmp_path):
+    # poem2.py writes output.txt into its working directory
+    for name in ("words2.txt", "frost_poems.txt", "stray_birds.txt"):
+        os.symlink(os.path.join(repo_root, name), tmp_path / name)
+    _cli(os.path.join(repo_root, "poem2.py"), "--seed", str(SEED), cwd=tmp_path)
+    written = (tmp_path / "output.txt").read_text()
+    assert _serve("poem2", tmp_path) == written
+
+
+@pytest.mark.parametrize("engine, script", [("markov", "frost_markov.py"), ("hmm", "frost_hmm.py")])
+def test_frost_matches_cli(repo_root, tmp_path, engine, script):
+    _require_nltk(engine)
+    printed = _cli(script, "frost_poems.txt", "--seed", str(SEED), "--lines", str(4 * STANZAS), cwd=repo_root)
+    assert _serve(engine, tmp_path) == printed.strip()
+
+
+def test_integer_seeds_are_parsed():
+    assert poem_server._parse_seed("42") == 42
+    assert poem_server._parse_seed("autumn") == "autumn"